@@ -0,0 +1,167 @@
+"""
+In-memory index of installed applications for fast fuzzy name lookup.
+
+    python app_index.py 5000      (benchmark lookups against a fake app list)
+"""
+import bisect
+import re
+import sys
+import threading
+import time
+
+ALIASES = {
+    "chrome": "google chrome",
+    "browser": "google chrome",
+    "edge": "microsoft edge",
+    "vs code": "visual studio code",
+    "vscode": "visual studio code",
+    "code": "visual studio code",
+    "files": "file explorer",
+    "explorer": "file explorer",
+    "terminal": "windows terminal",
+    "cmd": "command prompt",
+}
+NOISE = re.compile(r"\b(microsoft|the|app|application|\d+(\.\d+)*|x64|x86)\b")
+
+
+def normalize(name):
+    name = re.sub(r"[^a-z0-9 ]+", " ", name.lower())
+    return " ".join(NOISE.sub(" ", name).split()) or " ".join(name.split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_appopener_names():
+    """Installed app names as known to AppOpener (creates its list on first use)."""
+    from AppOpener import give_appnames
+    return list(give_appnames())
+
+
+class AppIndex:
+    """
+    Normalized names, a sorted prefix list and a trigram index, built once and
+    swapped atomically when a background refresh sees the app list change.
+    """
+
+    def __init__(self, loader=load_appopener_names, names=None, aliases=ALIASES, min_score=0.35,
+                 min_fuzzy_len=3):
+        self.loader = loader
+        self.aliases = aliases
+        self.min_score = min_score
+        # Shorter queries only match exactly; "ex" should not open the first app starting with it.
+        self.min_fuzzy_len = min_fuzzy_len
+        self._data = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        if names is not None:
+            self._build(names)
+
+    def _build(self, names):
+        originals = {}
+        for name in names:
+            originals.setdefault(normalize(name), name)
+        keys = sorted(originals)
+        grams = {}
+        for i, key in enumerate(keys):
+            for gram in trigrams(key):
+                grams.setdefault(gram, []).append(i)
+        data = (keys, originals, grams)
+        fingerprint = hash(tuple(keys))
+        with self._lock:
+            self._data = data
+            self._fingerprint = fingerprint
+
+    def _ensure(self):
+        if self._data is None:
+            self._build(self.loader())
+        return self._data
+
+    def __len__(self):
+        return len(self._ensure()[0])
+
+    def exact_match(self, query):
+        """Returns the installed app name for an exact name or alias, or None."""
+        keys, originals, grams = self._ensure()
+        q = normalize(query)
+        if not q:
+            return None
+        return originals.get(normalize(self.aliases.get(q, q)))
+
+    def best_match(self, query):
+        """Returns the installed app name best matching query, or None."""
+        keys, originals, grams = self._ensure()
+        q = normalize(query)
+        if not q:
+            return None
+        q = normalize(self.aliases.get(q, q))
+        if q in originals:
+            return originals[q]
+        if len(q) < self.min_fuzzy_len:
+            return None
+        i = bisect.bisect_left(keys, q)
+        if i < len(keys) and keys[i].startswith(q):
+            return originals[keys[i]]
+        q_grams = trigrams(q)
+        counts = {}
+        for gram in q_grams:
+            for idx in grams.get(gram, ()):
+                counts[idx] = counts.get(idx, 0) + 1
+        best, best_score = None, 0.0
+        for idx, shared in counts.items():
+            key = keys[idx]
+            score = shared / (len(q_grams) + len(key) + 2 - shared)
+            if q in key:
+                score += 0.3
+            if score > best_score:
+                best, best_score = key, score
+        if best is None or best_score < self.min_score:
+            return None
+        return originals[best]
+
+    def refresh(self):
+        """Reloads the app list; returns True if it changed."""
+        names = self.loader()
+        old = self._fingerprint
+        self._build(names)
+        return self._fingerprint != old
+
+    def start_background_refresh(self, interval=600):
+        if self._refresh_thread is not None:
+            return
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"App index refresh failed: {e}")
+        self._refresh_thread = threading.Thread(target=run, name="app-index", daemon=True)
+        self._refresh_thread.start()
+
+
+def _bench(count):
+    import random
+    words = ["studio", "player", "office", "cloud", "photo", "editor", "music", "sync", "pro", "lite",
+             "note", "paint", "chat", "mail", "code", "launcher", "manager", "viewer", "reader", "drive"]
+    rng = random.Random(1)
+    names = ["Google Chrome", "Visual Studio Code", "Spotify", "Microsoft Edge", "Notepad"]
+    names += [" ".join(rng.sample(words, 3)).title() + f" V{i}" for i in range(count)]
+    start = time.perf_counter()
+    index = AppIndex(names=names)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = ["chrome", "spotfy", "vs code", "notepad", "photo editr", "cloud sync pro", "nothing here"] * 100
+    start = time.perf_counter()
+    for q in queries:
+        index.best_match(q)
+    per_lookup = (time.perf_counter() - start) * 1e6 / len(queries)
+    print(f"{len(index)} apps: build {build_ms:.1f} ms, lookup {per_lookup:.0f} us")
+    for q in queries[:7]:
+        print(f"  {q!r} -> {index.best_match(q)!r}")
+
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,304 @@
+"""
+Continuous audio capture with energy-based voice activity detection.
+
+The input stream is opened once and read on a background thread. Ambient
+noise is measured once at startup and then tracked continuously, and each
+detected utterance is put on a queue for recognition.
+
+    python audio_capture.py recording.wav     (segment a WAV file and report latency)
+    python audio_capture.py --synthetic
+"""
+import math
+import queue
+import sys
+import threading
+import time
+import warnings
+import wave
+from array import array
+from collections import deque
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+
+def rms(frame, sample_width=2):
+    if audioop is not None:
+        return audioop.rms(frame, sample_width)
+    samples = array("h", frame)
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+class MicrophoneSource:
+    """Keeps one speech_recognition Microphone stream open for the whole session."""
+
+    def __init__(self, device_index=None, sample_rate=16000, frame_ms=30):
+        import speech_recognition as sr
+        self.frame_ms = frame_ms
+        self._mic = sr.Microphone(device_index=device_index, sample_rate=sample_rate,
+                                  chunk_size=int(sample_rate * frame_ms / 1000))
+        self._mic.__enter__()
+        self.sample_rate = self._mic.SAMPLE_RATE
+        self.sample_width = self._mic.SAMPLE_WIDTH
+        self.frame_bytes = self._mic.CHUNK * self.sample_width
+
+    def read(self):
+        return self._mic.stream.read(self._mic.CHUNK)
+
+    def close(self):
+        self._mic.__exit__(None, None, None)
+
+
+class WavSource:
+    """Plays a 16-bit mono WAV file as if it came from a microphone."""
+
+    def __init__(self, path, frame_ms=30, realtime=True):
+        self._wav = wave.open(path, "rb")
+        if self._wav.getnchannels() != 1 or self._wav.getsampwidth() != 2:
+            raise ValueError("WAV source must be 16-bit mono")
+        self.frame_ms = frame_ms
+        self.sample_rate = self._wav.getframerate()
+        self.sample_width = 2
+        self._frames_per_read = int(self.sample_rate * frame_ms / 1000)
+        self.frame_bytes = self._frames_per_read * 2
+        self.realtime = realtime
+        self._next = time.perf_counter()
+
+    def read(self):
+        data = self._wav.readframes(self._frames_per_read)
+        if len(data) < self.frame_bytes:
+            if not data:
+                raise EOFError
+            data += b"\0" * (self.frame_bytes - len(data))
+        if self.realtime:
+            self._next += self.frame_ms / 1000
+            delay = self._next - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        self._wav.close()
+
+
+class SyntheticSource:
+    """Low noise with tone bursts standing in for speech; for tests without a microphone."""
+
+    def __init__(self, pattern=((1.0, 0), (1.2, 1), (1.0, 0), (0.8, 1), (1.0, 0)),
+                 sample_rate=16000, frame_ms=30, realtime=True, noise=60, amplitude=4000):
+        self.sample_rate = sample_rate
+        self.sample_width = 2
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        n = int(sample_rate * frame_ms / 1000)
+        self.frame_bytes = n * 2
+        quiet = array("h", (int(noise * math.sin(i * 0.9)) for i in range(n))).tobytes()
+        loud = array("h", (int(amplitude * math.sin(2 * math.pi * 220 * i / sample_rate)) for i in range(n))).tobytes()
+        self._frames = iter([loud if voiced else quiet
+                             for seconds, voiced in pattern
+                             for _ in range(int(seconds * 1000 / frame_ms))])
+        self._next = time.perf_counter()
+
+    def read(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            raise EOFError
+        if self.realtime:
+            self._next += self.frame_ms / 1000
+            delay = self._next - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return frame
+
+    def close(self):
+        pass
+
+
+class Utterance:
+    __slots__ = ("pcm", "sample_rate", "sample_width", "speech_start", "speech_end", "emitted_at",
+                 "barge_in", "echo")
+
+    def __init__(self, pcm, sample_rate, sample_width, speech_start, speech_end, emitted_at,
+                 barge_in=False, echo=False):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.speech_start = speech_start
+        self.speech_end = speech_end
+        self.emitted_at = emitted_at
+        # barge_in: started over assistant playback and passed the stricter gate.
+        # echo: mostly recorded during playback without a barge-in; should be discarded.
+        self.barge_in = barge_in
+        self.echo = echo
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (self.sample_rate * self.sample_width)
+
+    def to_audio_data(self):
+        import speech_recognition as sr
+        return sr.AudioData(self.pcm, self.sample_rate, self.sample_width)
+
+
+class AudioCapture:
+    """
+    Reads frames from a source on a background thread, tracks the ambient
+    energy level and cuts speech into Utterances on self.utterances.
+
+    While is_playing() is true (the assistant is talking) and for tail_s
+    after, the assistant's own voice reaches the microphone, so speech must
+    be barge_in_ratio times louder than usual and last barge_in_s seconds
+    to count, and the ambient level is not updated.
+    """
+
+    def __init__(self, source, calibration_s=0.5, energy_ratio=2.5, min_energy=150,
+                 start_frames=3, pause_s=0.6, preroll_s=0.3, max_phrase_s=10,
+                 on_speech_start=None, on_speech_frame=None, on_speech_end=None,
+                 is_playing=None, barge_in_ratio=3.0, barge_in_s=0.3, tail_s=0.4):
+        self.source = source
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.start_frames = start_frames
+        self.is_playing = is_playing
+        self.barge_in_ratio = barge_in_ratio
+        self.on_speech_start = on_speech_start
+        # Streaming recognizers get every frame of an utterance as it is captured.
+        self.on_speech_frame = on_speech_frame
+        self.on_speech_end = on_speech_end
+        frame_s = source.frame_ms / 1000
+        self._calibration_frames = max(1, int(calibration_s / frame_s))
+        self._pause_frames = max(1, int(pause_s / frame_s))
+        self._max_frames = int(max_phrase_s / frame_s)
+        self._barge_in_frames = max(start_frames, int(barge_in_s / frame_s))
+        self._tail_frames = int(tail_s / frame_s)
+        self._tail_left = 0
+        self._preroll = deque(maxlen=max(1, int(preroll_s / frame_s)))
+        self.ambient = None
+        self.utterances = queue.Queue()
+        self.running = False
+        self.error = None
+        self._thread = None
+
+    @property
+    def threshold(self):
+        return max(self.min_energy, (self.ambient or 0) * self.energy_ratio)
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def get(self, timeout=None):
+        """Returns the next Utterance, or None on timeout / end of source."""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _playing(self):
+        if self.is_playing is not None and self.is_playing():
+            self._tail_left = self._tail_frames + 1
+        elif self._tail_left:
+            self._tail_left -= 1
+        return self._tail_left > 0
+
+    def _update_ambient(self, energy):
+        # Slow exponential average so background noise changes are tracked
+        # without speech pulling the threshold up.
+        self.ambient = energy if self.ambient is None else self.ambient * 0.95 + energy * 0.05
+
+    def _run(self):
+        source = self.source
+        try:
+            energies = [rms(source.read(), source.sample_width) for _ in range(self._calibration_frames)]
+            self.ambient = sum(energies) / len(energies)
+            voiced_run = 0
+            silent_run = 0
+            speech = None
+            speech_start = None
+            barge_in = False
+            played_frames = 0
+            while self.running:
+                frame = source.read()
+                now = time.perf_counter()
+                energy = rms(frame, source.sample_width)
+                playing = self._playing()
+                threshold = self.threshold * (self.barge_in_ratio if playing else 1)
+                voiced = energy > threshold
+                if speech is None:
+                    self._preroll.append(frame)
+                    if voiced:
+                        voiced_run += 1
+                        if voiced_run >= (self._barge_in_frames if playing else self.start_frames):
+                            speech = list(self._preroll)
+                            speech_start = now
+                            silent_run = 0
+                            barge_in = playing
+                            played_frames = 0
+                            self._preroll.clear()
+                            if self.on_speech_start:
+                                self.on_speech_start()
+                            if self.on_speech_frame:
+                                for f in speech:
+                                    self.on_speech_frame(f)
+                    else:
+                        voiced_run = 0
+                        if not playing:
+                            self._update_ambient(energy)
+                    continue
+                speech.append(frame)
+                played_frames += playing
+                if self.on_speech_frame:
+                    self.on_speech_frame(frame)
+                silent_run = 0 if voiced else silent_run + 1
+                if silent_run >= self._pause_frames or len(speech) >= self._max_frames:
+                    speech_end = now - silent_run * source.frame_ms / 1000
+                    if self.on_speech_end:
+                        self.on_speech_end()
+                    echo = not barge_in and played_frames * 2 > len(speech)
+                    self.utterances.put(Utterance(b"".join(speech), source.sample_rate, source.sample_width,
+                                                  speech_start, speech_end, time.perf_counter(),
+                                                  barge_in, echo))
+                    speech = None
+                    voiced_run = 0
+        except EOFError:
+            pass
+        except Exception as e:
+            self.error = e
+            print(f"Audio capture error: {e}")
+        finally:
+            self.running = False
+            self.utterances.put(None)
+            source.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] != "--synthetic":
+        source = WavSource(argv[0])
+    else:
+        source = SyntheticSource()
+    capture = AudioCapture(source).start()
+    count = 0
+    while True:
+        utterance = capture.get()
+        if utterance is None:
+            break
+        count += 1
+        print(f"utterance {count}: {utterance.duration:.2f}s audio, "
+              f"endpoint latency {(utterance.emitted_at - utterance.speech_end) * 1000:.0f} ms")
+    print(f"{count} utterances, final threshold {capture.threshold:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Reports cold import times for the assistant's modules and their heavy
+dependencies, and the time from launching main.py until Vecna is Ready.
+
+    python bench_startup.py
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULES = ["tool_registry", "tools", "voice", "stt", "audio_capture", "intents", "tool_cache",
+           "memory", "streaming", "tool_executor", "ui_events", "main"]
+DEPENDENCIES = ["google.generativeai", "speech_recognition", "pyautogui", "screen_brightness_control",
+                "wikipedia", "pywhatkit", "AppOpener"]
+READY_TIMEOUT = 60
+
+
+def time_import(module):
+    """Imports module in a fresh interpreter and returns (seconds, error)."""
+    code = (
+        "import time, sys; t = time.perf_counter(); "
+        f"import {module}; "
+        "sys.stdout.write(str(time.perf_counter() - t))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {result.returncode}"
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def time_to_ready():
+    """Launches main.py headless (no microphone, no speech) and waits for its Ready line."""
+    env = dict(os.environ, VECNA_AUDIO_SOURCE="synthetic", VECNA_TTS="null", PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=HERE, env=env, text=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    timer = threading.Timer(READY_TIMEOUT, proc.kill)
+    timer.start()
+    last = ""
+    try:
+        for line in proc.stdout:
+            if line.startswith("Ready in "):
+                return time.perf_counter() - start, None
+            last = line.strip() or last
+        if time.perf_counter() - start >= READY_TIMEOUT:
+            return None, "timed out"
+        return None, f"main.py exited before Ready ({last})"
+    finally:
+        timer.cancel()
+        proc.kill()
+        proc.wait()
+
+
+def report(title, modules):
+    print(title)
+    for module in modules:
+        seconds, error = time_import(module)
+        if error:
+            print(f"  {module:<26} failed: {error}")
+        else:
+            print(f"  {module:<26} {seconds * 1000:8.1f} ms")
+
+
+def main():
+    report("Cold import times (assistant modules):", MODULES)
+    report("Cold import times (dependencies):", DEPENDENCIES)
+    seconds, error = time_to_ready()
+    if error:
+        print(f"Time to Ready skipped: {error}")
+        return
+    print(f"time to Ready: {seconds * 1000:8.1f} ms (from process launch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Local fast path for simple, deterministic commands. Inputs that match one
+of the patterns below run the tool directly instead of going through Gemini;
+everything else falls through to the model.
+"""
+import re
+
+# Multi-step requests are left to the model.
+COMPOUND = re.compile(r"\b(and|then|also|after that)\b")
+FILLER = re.compile(r"^(hey |ok |okay )?(vecna[, ]*)?(please |can you |could you |would you )?|( please| for me| now)+$")
+
+
+PRONOUNS = {"it", "this", "that", "them", "these", "those"}
+
+
+class Intent:
+    __slots__ = ("name", "tool", "keywords", "patterns", "args", "reply", "check")
+
+    def __init__(self, name, tool, keywords, patterns, args=None, reply=None, check=None):
+        self.name = name
+        self.tool = tool
+        self.keywords = keywords
+        self.patterns = [re.compile(p) for p in patterns]
+        self.args = args or (lambda m: {})
+        self.reply = reply or (lambda result: result)
+        # Extra test on the extracted arguments; a False result sends the input to the model.
+        self.check = check or (lambda kwargs: True)
+
+
+def _volume_action(m):
+    word = m.group("dir")
+    if word in ("up", "louder", "increase", "raise"):
+        return {"action": "up"}
+    if word in ("down", "quieter", "lower", "decrease", "softer"):
+        return {"action": "down"}
+    return {"action": "mute"}
+
+
+def _known_app(kwargs):
+    """Only names that are installed apps (or aliases of one) are opened or closed directly."""
+    name = kwargs["app_name"]
+    if name in PRONOUNS:
+        return False
+    from tools import app_index
+    return app_index.exact_match(name) is not None
+
+
+INTENTS = [
+    Intent("time", "get_time", ("time",),
+           [r"what(?:'s| is) the time", r"what time is it", r"(?:tell me |current )?(?:the )?time"],
+           reply=lambda r: f"It's {r}."),
+    Intent("date", "get_date", ("date", "day"),
+           [r"what(?:'s| is) (?:the |today's )?date(?: today)?", r"what day is (?:it|today)", r"(?:today's )?date"],
+           reply=lambda r: f"Today is {r}."),
+    Intent("volume", "control_volume", ("volume", "mute", "louder", "quieter", "unmute"),
+           [r"(?:turn |put )?(?:the )?volume (?P<dir>up|down)",
+            r"(?P<dir>increase|raise|lower|decrease) (?:the )?volume",
+            r"(?:turn it |make it )?(?P<dir>louder|quieter|softer)",
+            r"(?P<dir>mute|unmute)(?: the)?(?: volume| sound| audio)?"],
+           args=_volume_action),
+    Intent("screenshot", "take_screenshot", ("screenshot", "screen"),
+           [r"(?:take |grab |capture )?(?:a )?screenshot", r"capture (?:the )?screen"]),
+    Intent("brightness", "set_brightness", ("brightness",),
+           [r"(?:set |change )?(?:the )?brightness (?:to )?(?P<level>\d{1,3})(?: ?%| percent)?"],
+           args=lambda m: {"level": min(100, int(m.group("level")))}),
+    Intent("open", "open_app", ("open", "launch"),
+           [r"(?:open|launch) (?:up )?(?:the )?(?P<app>[\w .+-]{2,40}?)(?: app| application)?"],
+           args=lambda m: {"app_name": m.group("app").strip()}, check=_known_app),
+    Intent("close", "close_app", ("close", "quit", "kill"),
+           [r"(?:close|quit|kill) (?:the )?(?P<app>[\w .+-]{2,40}?)(?: app| application)?"],
+           args=lambda m: {"app_name": m.group("app").strip()}, check=_known_app),
+    Intent("youtube", "play_youtube", ("youtube",),
+           [r"play (?P<query>.{2,80}?) on youtube"],
+           args=lambda m: {"query": m.group("query")}),
+    Intent("weather", "check_weather", ("weather",),
+           [r"(?:what(?:'s| is) the )?weather (?:like )?in (?P<city>[a-z .'-]{2,40}?)(?: right now| today)?"],
+           args=lambda m: {"city": m.group("city").strip()}),
+]
+
+
+class FastMatch:
+    __slots__ = ("intent", "func", "kwargs")
+
+    def __init__(self, intent, func, kwargs):
+        self.intent = intent
+        self.func = func
+        self.kwargs = kwargs
+
+    def execute(self):
+        return self.intent.reply(self.func(**self.kwargs))
+
+
+class IntentRouter:
+    """
+    Matches normalized input against precompiled patterns. A keyword index
+    narrows each input down to the few intents that could apply, and only
+    full matches are accepted so anything ambiguous goes to the model.
+    """
+
+    def __init__(self, tools_by_name, intents=INTENTS):
+        self.tools_by_name = tools_by_name
+        self.intents = [i for i in intents if i.tool in tools_by_name]
+        self.index = {}
+        for intent in self.intents:
+            for keyword in intent.keywords:
+                self.index.setdefault(keyword, []).append(intent)
+        self.hits = 0
+        self.misses = 0
+        self.saved_s = 0.0
+        self._model_latency = None
+
+    @staticmethod
+    def normalize(text):
+        text = re.sub(r"[^\w\s'%.+-]", " ", text.lower())
+        text = " ".join(text.replace("?", " ").split()).rstrip(".")
+        return FILLER.sub("", text).strip()
+
+    def match(self, text, check=True):
+        """
+        Returns a FastMatch or None. check=False skips the intents' argument
+        checks (e.g. the app index lookup), for cheap matching of partial text.
+        """
+        text = self.normalize(text)
+        if not text or COMPOUND.search(text):
+            return None
+        candidates = []
+        for word in text.split():
+            for intent in self.index.get(word, ()):
+                if intent not in candidates:
+                    candidates.append(intent)
+        for intent in candidates:
+            for pattern in intent.patterns:
+                m = pattern.fullmatch(text)
+                if m:
+                    kwargs = intent.args(m)
+                    if check and not intent.check(kwargs):
+                        return None
+                    return FastMatch(intent, self.tools_by_name[intent.tool], kwargs)
+        return None
+
+    def route(self, text):
+        """Returns a FastMatch for high-confidence commands, else None (use the model)."""
+        result = self.match(text)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def record_fast(self, seconds):
+        if self._model_latency is not None:
+            self.saved_s += max(0.0, self._model_latency - seconds)
+
+    def record_model(self, seconds):
+        """Feeds model turn latency so saved time can be estimated."""
+        if self._model_latency is None:
+            self._model_latency = seconds
+        else:
+            self._model_latency = self._model_latency * 0.8 + seconds * 0.2
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return f"fast path {self.hits}/{self.hits + self.misses} ({self.hit_rate:.0%}), saved ~{self.saved_s:.1f}s"
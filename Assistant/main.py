@@ -1,15 +1,24 @@
 import os
 import threading
+import time
+STARTED = time.perf_counter()  # before the heavier imports below, for the Ready timing
 import tkinter as tk
 from tkinter import scrolledtext
-import speech_recognition as sr
-import google.generativeai as genai
 from dotenv import load_dotenv
 import tools   
 import voice    
+import tool_registry
+from streaming import stream_turn
+from intents import IntentRouter
+from tool_cache import cache_tools
+from memory import ConversationMemory
+from tool_executor import ToolExecutor, complete_turn
+from audio_capture import AudioCapture, MicrophoneSource, SyntheticSource, WavSource
+from ui_events import UIEventBus
+from stt import RecognizerError, SpeechNotRecognized, SpeechRecognizer
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+STREAMING = os.getenv("VECNA_STREAM", "1") != "0"
 my_tools = [
     tools.open_app,
     tools.close_app,
@@ -22,18 +31,48 @@ my_tools = [
     tools.play_youtube,
     tools.search_wikipedia
 ]
-model = genai.GenerativeModel(
-    model_name='gemini-2.0-flash', 
-    tools=my_tools,
-    system_instruction="You are Vecna. You control the user's PC. "
-                       "Capabilities: Open/Close apps, Play music (YouTube), "
-                       "Control volume/brightness, Take screenshots, Check Date/Time, Search Wikipedia, and CHECK WEATHER. "
-                       "If the user says a city name (e.g. 'Paris'), check the weather for that city. "
-                       "IMPORTANT: If a tool returns an error, SPEAK THAT EXACT ERROR. "
-                       "KEEP RESPONSES VERY SHORT (under 2 sentences)."
-)
+# Read-only lookups (weather, Wikipedia) get a TTL cache; side-effecting tools are left as is.
+my_tools = cache_tools(my_tools)
+SYSTEM_INSTRUCTION = ("You are Vecna. You control the user's PC. "
+                      "Capabilities: Open/Close apps, Play music (YouTube), "
+                      "Control volume/brightness, Take screenshots, Check Date/Time, Search Wikipedia, and CHECK WEATHER. "
+                      "If the user says a city name (e.g. 'Paris'), check the weather for that city. "
+                      "IMPORTANT: If a tool returns an error, SPEAK THAT EXACT ERROR. "
+                      "KEEP RESPONSES VERY SHORT (under 2 sentences).")
+
+def create_chat():
+    """
+    Imports and configures the Gemini SDK and starts the chat session. Called
+    from the voice thread so the window is up before this (slow) step runs.
+    """
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    model = genai.GenerativeModel(
+        model_name='gemini-2.0-flash', 
+        tools=my_tools,
+        system_instruction=SYSTEM_INSTRUCTION
+    )
+    memory.summarizer = genai.GenerativeModel(model_name='gemini-2.0-flash')
+    # Tool calls are dispatched by ToolExecutor (parallel where safe) rather than
+    # by the SDK's automatic function calling, which runs them one by one.
+    return model.start_chat(enable_automatic_function_calling=False)
 
-chat = model.start_chat(enable_automatic_function_calling=True)
+def open_audio_source():
+    """VECNA_AUDIO_SOURCE: 'mic' (default), 'synthetic' or a path to a 16-bit mono WAV file."""
+    name = os.getenv("VECNA_AUDIO_SOURCE", "mic")
+    if name == "mic":
+        return MicrophoneSource()
+    if name == "synthetic":
+        return SyntheticSource()
+    return WavSource(name)
+
+TOOLS_BY_NAME = {f.__name__: f for f in my_tools}
+executor = ToolExecutor(TOOLS_BY_NAME)
+router = IntentRouter(TOOLS_BY_NAME)
+memory = ConversationMemory(
+    keep_turns=int(os.getenv("VECNA_MEMORY_TURNS", "6")),
+    max_tokens=int(os.getenv("VECNA_MEMORY_TOKENS", "2000")),
+)
 class VecnaGUI:
     def __init__(self, root):
         self.root = root
@@ -43,55 +82,162 @@ class VecnaGUI:
         self.status_label.pack(pady=10)
         self.chat_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, font=("Consolas", 11))
         self.chat_area.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
-        self.chat_area.insert(tk.END, "System: Vecna is starting up...\n")
+        # Widgets are only touched on the Tk thread; the voice thread posts to this bus.
+        self.ui = UIEventBus(root, self.status_label, self.chat_area,
+                             fps=int(os.getenv("VECNA_UI_FPS", "30")),
+                             max_lines=int(os.getenv("VECNA_TRANSCRIPT_LINES", "500"))).start()
+        self.ui.message("System", "Vecna is starting up...")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.chat = None
         self.is_running = True
+        if os.getenv("VECNA_WARMUP", "1") != "0":
+            # Import the tools' dependencies in the background once the window is drawn.
+            self.root.after(200, lambda: tool_registry.warm_up(
+                on_done=lambda: print(f"Tool warm-up: {tool_registry.report()}")))
         self.thread = threading.Thread(target=self.run_voice_loop)
         self.thread.daemon = True 
         self.thread.start()
 
     def update_status(self, text):
-        """Updates the status label safely."""
-        self.status_label.config(text=f"Status: {text}")
+        """Updates the status label safely (from any thread)."""
+        self.ui.status(text)
 
     def log_message(self, sender, message):
         """Adds a message to the chat window."""
-        self.chat_area.insert(tk.END, f"{sender}: {message}\n")
-        self.chat_area.see(tk.END) 
+        self.ui.message(sender, message)
+
+    def begin_message(self, sender):
+        """Starts a chat line that streamed text is appended to."""
+        self.ui.text(f"{sender}: ")
+
+    def append_message(self, text):
+        self.ui.text(text)
+
+    def close(self):
+        self.is_running = False
+        print(self.ui.stats())
+        self.ui.stop()
+        self.root.destroy()
+
+    def finish_model_turn(self, latency_s):
+        router.record_model(latency_s)
+        memory.after_turn(self.chat, latency_s)
+        if executor.stats:
+            print(f"Tools: {executor.report()}")
+
+    def respond_fast(self, user_input):
+        """Runs simple commands locally without a Gemini round trip. Returns True if handled."""
+        match = router.route(user_input)
+        if match is None:
+            return False
+        started = time.perf_counter()
+        reply = match.execute()
+        router.record_fast(time.perf_counter() - started)
+        self.log_message("Vecna", reply)
+        voice.say(reply)
+        print(f"Intent '{match.intent.name}': {router.stats()}")
+        self.update_status("Ready")
+        return True
+
+    def respond_streaming(self, user_input):
+        """Streams the reply into the chat pane and speaks each sentence as it completes."""
+        utterances = []
+        def on_sentence(sentence):
+            if not utterances:
+                self.update_status("Speaking...")
+            utterances.append(voice.say(sentence))
+        self.begin_message("Vecna")
+        sent_at = time.perf_counter()
+        text, first_sentence = stream_turn(self.chat, user_input, TOOLS_BY_NAME, on_text=self.append_message,
+                                           on_sentence=on_sentence, run_tools=executor.run)
+        self.append_message("\n")
+        if utterances and utterances[0].wait_started(timeout=5):
+            first = utterances[0]
+            ttfw = (first.enqueued_at - sent_at) * 1000 + first.first_audio_ms
+            print(f"Turn: first sentence {first_sentence * 1000:.0f} ms, first word {ttfw:.0f} ms")
+            self.update_status(f"Ready (first word {ttfw:.0f} ms)")
+            return
+        self.update_status("Ready")
+
+    def on_speech_start(self):
+        """Called from the capture thread when the user starts talking (barge-in)."""
+        self.speculated = set()
+        self.stt.on_speech_start()
+        if voice.get_worker().is_speaking:
+            voice.interrupt()
+
+    def on_partial(self, text):
+        """
+        Called with each partial hypothesis from a streaming recognizer. If it
+        already reads as a cached lookup (e.g. weather), that lookup starts now
+        so its result is waiting in the tool cache when the final text arrives.
+        """
+        self.update_status(f"Hearing: {text}")
+        match = router.match(text, check=False)
+        if match is None or not hasattr(match.func, "cache"):
+            return
+        key = (match.intent.tool, tuple(sorted(match.kwargs.items())))
+        if key not in self.speculated:
+            self.speculated.add(key)
+            executor.prefetch(match.func, **match.kwargs)
 
     def run_voice_loop(self):
         """The main logic loop, running in a background thread."""
-        recognizer = sr.Recognizer()
-        
-        recognizer.pause_threshold = 0.6 
-        recognizer.non_speaking_duration = 0.4 
-        recognizer.dynamic_energy_threshold = True 
+        self.update_status("Connecting to Gemini...")
+        self.chat = create_chat()
+        self.update_status("Loading speech model...")
+        self.speculated = set()
+        source = open_audio_source()
+        self.stt = SpeechRecognizer(on_partial=self.on_partial, sample_rate=source.sample_rate).setup()
         voice.speak("System online. Vecna is ready.")
         self.update_status("Ready")
+        print(f"Ready in {(time.perf_counter() - STARTED) * 1000:.0f} ms")
+        capture = AudioCapture(source, pause_s=0.6,
+                               on_speech_start=self.on_speech_start,
+                               on_speech_frame=self.stt.on_speech_frame,
+                               on_speech_end=self.stt.on_speech_end,
+                               is_playing=lambda: voice.get_worker().is_speaking).start()
         while self.is_running:
             try:
-                with sr.Microphone() as source:
-                    self.update_status("Listening...")
-                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    audio = recognizer.listen(source, timeout=None, phrase_time_limit=10)
+                self.update_status("Listening...")
+                utterance = capture.get()
+                if utterance is None:
+                    self.update_status("Offline (audio input ended)")
+                    break
+                if utterance.echo:
+                    # Vecna's own reply picked up by the microphone.
+                    self.stt.discard(utterance)
+                    continue
                 self.update_status("Processing...")
-                user_input = recognizer.recognize_google(audio).lower()
+                user_input = self.stt.recognize(utterance).lower()
+                print(f"STT ({self.stt.name}): {self.stt.timings[-1]:.0f} ms after end of speech")
                 self.log_message("User", user_input)
-                if "exit" in user_input or "stop" in user_input:
+                if {"exit", "stop"} & set(user_input.split()):
                     voice.speak("Goodbye.")
                     self.update_status("Offline")
-                    self.root.quit()
+                    self.ui.call(self.close)
                     break
-                response = chat.send_message(user_input)
-                if response.text:
-                    self.log_message("Vecna", response.text)
+                if self.respond_fast(user_input):
+                    continue
+                # A summary written in the background since the last turn goes in now.
+                memory.apply_pending(self.chat)
+                started = time.perf_counter()
+                if STREAMING:
+                    self.respond_streaming(user_input)
+                    self.finish_model_turn(time.perf_counter() - started)
+                    continue
+                reply = complete_turn(self.chat, user_input, executor)
+                self.finish_model_turn(time.perf_counter() - started)
+                if reply:
+                    self.log_message("Vecna", reply)
                     self.update_status("Speaking...")
-                    voice.speak(response.text)
+                    voice.say(reply)
                     self.update_status("Ready")
-            except sr.UnknownValueError:
+            except SpeechNotRecognized:
                 self.update_status("Idle (No speech detected)")
-            except sr.RequestError:
-                self.update_status("Internet Error")
-                voice.speak("Internet connection error.")
+            except RecognizerError:
+                self.update_status("Internet Error" if self.stt.name == "google" else "Speech Recognition Error")
+                voice.speak("Internet connection error." if self.stt.name == "google" else "Speech recognition failed.")
             except Exception as e:
                 self.log_message("Error", str(e))
                 print(f"Error: {e}")
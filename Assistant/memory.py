@@ -0,0 +1,181 @@
+"""
+Keeps the Gemini chat history bounded. Recent turns stay verbatim, older
+turns are folded into a running summary and long tool outputs are trimmed,
+so per-turn request size (and latency) stops growing with session length.
+Summaries are written on a background thread and swapped into the chat
+between turns, so the summary call never delays a command.
+"""
+import threading
+
+CHARS_PER_TOKEN = 4
+SUMMARY_PROMPT = (
+    "Summarize this conversation between a user and the desktop assistant Vecna in at most "
+    "5 short bullet points. Keep facts, names, preferences and open requests; drop small talk.\n\n"
+)
+
+
+def part_chars(part):
+    if part.text:
+        return len(part.text)
+    if part.function_call and part.function_call.name:
+        return len(part.function_call.name) + len(str(dict(part.function_call.args or {})))
+    if part.function_response and part.function_response.name:
+        return len(str(dict(part.function_response.response or {})))
+    return 0
+
+
+def estimate_tokens(history):
+    return sum(part_chars(p) for content in history for p in content.parts) // CHARS_PER_TOKEN + 1
+
+
+def is_user_turn_start(content):
+    return content.role == "user" and any(p.text for p in content.parts)
+
+
+def split_turns(history):
+    turns = []
+    for content in history:
+        if is_user_turn_start(content) or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def turn_text(turn):
+    lines = []
+    for content in turn:
+        for part in content.parts:
+            if part.text:
+                lines.append(f"{content.role}: {part.text}")
+            elif part.function_response and part.function_response.name:
+                lines.append(f"tool {part.function_response.name}: {dict(part.function_response.response or {})}")
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """
+    Compacts the history once it grows past max_tokens, down to about
+    low_water * max_tokens, so it doesn't have to compact again every turn.
+    """
+
+    def __init__(self, keep_turns=6, max_tokens=2000, max_tool_chars=400, summarizer=None, low_water=0.5):
+        self.keep_turns = keep_turns
+        self.max_tokens = max_tokens
+        self.max_tool_chars = max_tool_chars
+        self.summarizer = summarizer
+        self.low_water = low_water
+        self.summary = ""
+        self.turn_log = []
+        self._pending = None
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _summarize(self, old_turns):
+        text = "\n\n".join(turn_text(t) for t in old_turns)
+        if self.summary:
+            text = f"Earlier summary:\n{self.summary}\n\n{text}"
+        if self.summarizer is not None:
+            try:
+                return self.summarizer.generate_content(SUMMARY_PROMPT + text).text.strip()
+            except Exception as e:
+                print(f"Summary failed, keeping a short extract: {e}")
+        # Fallback: the first line of each old user request.
+        requests = [line[6:120] for line in text.splitlines() if line.startswith("user: ")]
+        return "\n".join(filter(None, [self.summary] + [f"- {r}" for r in requests]))[-1500:]
+
+    def _trim_tool_output(self, content):
+        import google.generativeai as genai
+        parts = []
+        changed = False
+        for part in content.parts:
+            response = part.function_response
+            if response and response.name:
+                result = str(dict(response.response or {}).get("result", ""))
+                if len(result) > self.max_tool_chars:
+                    part = genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                        name=response.name, response={"result": result[:self.max_tool_chars] + "..."}))
+                    changed = True
+            parts.append(part)
+        if not changed:
+            return content
+        return genai.protos.Content(role=content.role, parts=parts)
+
+    def _split(self, history):
+        """Splits history into (old turns, recent turns); recent ones fit under the low watermark."""
+        turns = split_turns(history)
+        if turns and turns[0][0].parts and turns[0][0].parts[0].text.startswith("Summary of our earlier"):
+            turns = turns[1:]
+        budget = self.max_tokens * self.low_water
+        keep = 1
+        while keep < min(self.keep_turns, len(turns)):
+            candidate = [c for turn in turns[-(keep + 1):] for c in turn]
+            if estimate_tokens(candidate) > budget:
+                break
+            keep += 1
+        return turns[:-keep], turns[-keep:]
+
+    def _swap(self, chat, size, summary, recent):
+        """Replaces the first size contents of chat.history; later ones were added since and are kept."""
+        import google.generativeai as genai
+        self.summary = summary
+        new_history = []
+        if summary:
+            new_history.append(genai.protos.Content(role="user", parts=[genai.protos.Part(
+                text=f"Summary of our earlier conversation:\n{summary}")]))
+            new_history.append(genai.protos.Content(role="model", parts=[genai.protos.Part(text="Got it.")]))
+        for turn in recent:
+            new_history.extend(self._trim_tool_output(c) for c in turn)
+        chat.history = new_history + list(chat.history)[size:]
+
+    def compact(self, chat, background=False):
+        """
+        Compacts chat.history when it exceeds the budget. With background=True
+        the summary is written on a worker thread and swapped in later by
+        apply_pending(). Returns True if the history changed now.
+        """
+        history = list(chat.history)
+        if estimate_tokens(history) <= self.max_tokens:
+            return False
+        # One summary at a time; the next one has to build on it.
+        if self._pending is not None or (self._worker is not None and self._worker.is_alive()):
+            return False
+        old, recent = self._split(history)
+        if not old:
+            self._swap(chat, len(history), self.summary, recent)
+            return True
+        if not background:
+            self._swap(chat, len(history), self._summarize(old), recent)
+            return True
+
+        def run():
+            summary = self._summarize(old)
+            with self._lock:
+                self._pending = (len(history), summary, recent)
+        self._worker = threading.Thread(target=run, name="memory-summary", daemon=True)
+        self._worker.start()
+        return False
+
+    def apply_pending(self, chat):
+        """Swaps in a finished background summary. Call between turns, on the thread that uses chat."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return False
+        self._swap(chat, *pending)
+        return True
+
+    def after_turn(self, chat, latency_s):
+        """Logs context size and latency for the finished turn, then starts compaction if needed."""
+        tokens = estimate_tokens(chat.history)
+        compacted = self.apply_pending(chat)
+        compacted = self.compact(chat, background=True) or compacted
+        entry = {
+            "turn": len(self.turn_log) + 1,
+            "context_tokens": tokens,
+            "latency_ms": round(latency_s * 1000),
+            "compacted_to": estimate_tokens(chat.history) if compacted else None,
+        }
+        self.turn_log.append(entry)
+        print(f"Turn {entry['turn']}: ~{tokens} context tokens, model {entry['latency_ms']} ms"
+              + (f", compacted to ~{entry['compacted_to']}" if compacted else ""))
+        return entry
@@ -0,0 +1,102 @@
+import re
+import time
+
+SENTENCE_END = re.compile(r"(.+?[.!?…]+[\"')\]]*)(\s+|$)", re.S)
+MAX_TOOL_ROUNDS = 5
+# Sent with the results of the last allowed tool round so the model has to answer in text.
+FINAL_ROUND = {"tool_config": {"function_calling_config": {"mode": "NONE"}}}
+
+
+class SentenceSplitter:
+    """Collects streamed text and hands back whole sentences as soon as they end."""
+
+    def __init__(self, min_length=12):
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        sentences = []
+        pos = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if not match.group(2):
+                break
+            sentence = self.buffer[pos:match.end(1)].strip()
+            if len(sentence) >= self.min_length:
+                sentences.append(sentence)
+                pos = match.end()
+        self.buffer = self.buffer[pos:]
+        return sentences
+
+    def flush(self):
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+
+def call_tool(tools_by_name, function_call):
+    func = tools_by_name.get(function_call.name)
+    if func is None:
+        return f"Unknown tool: {function_call.name}"
+    try:
+        return func(**dict(function_call.args or {}))
+    except Exception as e:
+        return f"Error running {function_call.name}: {e}"
+
+
+def function_response_parts(calls, results):
+    # Imported here so loading this module doesn't pull in the Gemini SDK.
+    import google.generativeai as genai
+    return [
+        genai.protos.Part(function_response=genai.protos.FunctionResponse(
+            name=call.name, response={"result": result}))
+        for call, result in zip(calls, results)
+    ]
+
+
+def stream_turn(chat, user_input, tools_by_name, on_text=None, on_sentence=None, run_tools=None):
+    """
+    Sends one user turn with stream=True. Text is passed to on_text(chunk)
+    as it arrives and to on_sentence(sentence) once each sentence is complete.
+    Function calls are executed (via run_tools(calls) if given) and their
+    results streamed back to the model until it answers with text; after
+    MAX_TOOL_ROUNDS rounds the results are sent with tool calls disabled.
+    Returns (full_text, first_sentence_seconds).
+    """
+    start = time.perf_counter()
+    first_sentence_at = None
+    splitter = SentenceSplitter()
+    pieces = []
+    content = user_input
+    options = {}
+    for round_number in range(1, MAX_TOOL_ROUNDS + 2):
+        calls = []
+        for chunk in chat.send_message(content, stream=True, **options):
+            for candidate in chunk.candidates:
+                for part in candidate.content.parts:
+                    if part.function_call and part.function_call.name:
+                        calls.append(part.function_call)
+                    elif part.text:
+                        pieces.append(part.text)
+                        if on_text:
+                            on_text(part.text)
+                        for sentence in splitter.feed(part.text):
+                            if first_sentence_at is None:
+                                first_sentence_at = time.perf_counter() - start
+                            if on_sentence:
+                                on_sentence(sentence)
+        if not calls or round_number > MAX_TOOL_ROUNDS:
+            break
+        if run_tools:
+            results = run_tools(calls)
+        else:
+            results = [call_tool(tools_by_name, call) for call in calls]
+        content = function_response_parts(calls, results)
+        if round_number == MAX_TOOL_ROUNDS:
+            options = FINAL_ROUND
+    for sentence in splitter.flush():
+        if first_sentence_at is None:
+            first_sentence_at = time.perf_counter() - start
+        if on_sentence:
+            on_sentence(sentence)
+    return "".join(pieces), first_sentence_at
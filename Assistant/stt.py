@@ -0,0 +1,300 @@
+"""
+Speech-to-text backends. "google" sends each finished utterance to Google's
+web recognizer; "vosk" decodes locally on the CPU while the user is still
+speaking, reporting partial hypotheses and needing no network. The backend
+is chosen with VECNA_STT (and VECNA_VOSK_MODEL for the model directory).
+
+    python stt.py fixtures/               (latency and WER for every x.wav with an x.txt transcript)
+    python stt.py fixtures/ --backend google
+"""
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import wave
+
+
+class SpeechNotRecognized(Exception):
+    """The audio contained no recognizable words."""
+
+
+class RecognizerError(Exception):
+    """The backend could not run (network down, model missing, ...)."""
+
+
+class GoogleBackend:
+    """Google's free web recognizer via speech_recognition. Needs the network."""
+    name = "google"
+    streaming = False
+
+    def setup(self):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate, sample_width):
+        sr = self._sr
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(pcm, sample_rate, sample_width))
+        except sr.UnknownValueError:
+            raise SpeechNotRecognized()
+        except sr.RequestError as e:
+            raise RecognizerError(str(e))
+
+
+class VoskBackend:
+    """
+    Offline Kaldi recognizer. The model is loaded once and warmed up with a
+    short stretch of silence so the first real command isn't slowed down.
+    Audio must be 16-bit mono; the recognizer is created for the rate of the
+    audio it is given, since Kaldi decodes garbage at the wrong rate.
+    """
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=None, sample_rate=16000):
+        self.model_path = model_path or os.getenv("VECNA_VOSK_MODEL", "vosk-model-small-en-us")
+        self.sample_rate = sample_rate
+        self._recognizer = None
+
+    def setup(self):
+        try:
+            import vosk
+        except ImportError:
+            raise RecognizerError("vosk is not installed (pip install vosk)")
+        if not os.path.isdir(self.model_path):
+            raise RecognizerError(f"Vosk model not found at {self.model_path}")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(self.model_path)
+        self._recognizer = vosk.KaldiRecognizer(self._model, self.sample_rate)
+        self._recognizer.AcceptWaveform(b"\0" * self.sample_rate)
+        self._recognizer.FinalResult()
+
+    def begin(self, sample_rate=None):
+        if sample_rate and sample_rate != self.sample_rate:
+            self.sample_rate = sample_rate
+            self._recognizer = self._vosk.KaldiRecognizer(self._model, sample_rate)
+        else:
+            self._recognizer.Reset()
+        self._segments = []
+
+    def feed(self, pcm):
+        """Decodes more audio; returns the current hypothesis for the utterance."""
+        if self._recognizer.AcceptWaveform(pcm):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._segments.append(text)
+            return " ".join(self._segments)
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._segments + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        return " ".join(self._segments + ([text] if text else []))
+
+    def transcribe(self, pcm, sample_rate, sample_width):
+        if sample_width != 2:
+            raise RecognizerError(f"Vosk needs 16-bit audio, got {sample_width * 8}-bit")
+        self.begin(sample_rate)
+        self.feed(pcm)
+        return self.finish()
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+}
+
+BEGIN = object()
+END = object()
+
+
+class SpeechRecognizer:
+    """
+    Front end used by the voice loop. Streaming backends are fed audio frames
+    on their own decode thread as they are captured and call on_partial with
+    each new hypothesis; recognize() then only has to flush the last frames.
+    Other backends transcribe the whole utterance in recognize().
+    sample_rate is the rate of the frames passed to on_speech_frame.
+    """
+
+    def __init__(self, backend=None, on_partial=None, sample_rate=16000):
+        self.backend = backend or BACKENDS[os.getenv("VECNA_STT", "google")]()
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        if backend is None and self.backend.streaming:
+            # Warm the local model up at the rate it will be fed.
+            self.backend.sample_rate = sample_rate
+        self.timings = []
+        self._frames = queue.Queue()
+        self._finals = queue.Queue()
+        self._thread = None
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def setup(self):
+        """Loads and warms up the backend; falls back to Google if a local model can't load."""
+        started = time.perf_counter()
+        try:
+            self.backend.setup()
+        except Exception as e:
+            if isinstance(self.backend, GoogleBackend):
+                raise
+            print(f"STT Error: {e}. Falling back to Google.")
+            self.backend = GoogleBackend()
+            self.backend.setup()
+        if self.backend.streaming:
+            self._thread = threading.Thread(target=self._decode, name="stt", daemon=True)
+            self._thread.start()
+        print(f"STT: {self.backend.name} ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return self
+
+    # Called from the capture thread. Utterances are decoded in order on one
+    # thread, so the next one can start while the last result is still unread.
+    def on_speech_start(self):
+        if self._thread is not None:
+            self._frames.put(BEGIN)
+
+    def on_speech_frame(self, frame):
+        if self._thread is not None:
+            self._frames.put(frame)
+
+    def on_speech_end(self):
+        if self._thread is not None:
+            self._frames.put(END)
+
+    def _decode(self):
+        last = ""
+        failed = None
+        while True:
+            frame = self._frames.get()
+            try:
+                if frame is BEGIN:
+                    self.backend.begin(self.sample_rate)
+                    last, failed = "", None
+                elif frame is END:
+                    self._finals.put(failed or self.backend.finish())
+                elif failed is None:
+                    text = self.backend.feed(frame)
+                    if text and text != last:
+                        last = text
+                        self._report_partial(text)
+            except Exception as e:
+                failed = RecognizerError(str(e))
+                if frame is END:
+                    self._finals.put(failed)
+
+    def discard(self, utterance):
+        """Drops an utterance without transcribing it, keeping streaming results in step."""
+        if self._thread is not None:
+            self._finals.get()
+
+    def _report_partial(self, text):
+        # A failing callback must not fail the utterance being decoded.
+        if self.on_partial:
+            try:
+                self.on_partial(text)
+            except Exception as e:
+                print(f"STT partial callback failed: {e}")
+
+    def recognize(self, utterance):
+        """Returns the text for an audio_capture.Utterance."""
+        started = time.perf_counter()
+        if self._thread is not None:
+            text = self._finals.get()
+            if isinstance(text, Exception):
+                raise text
+        else:
+            text = self.backend.transcribe(utterance.pcm, utterance.sample_rate, utterance.sample_width)
+        self.timings.append((time.perf_counter() - started) * 1000)
+        del self.timings[:-100]
+        if not text.strip():
+            raise SpeechNotRecognized()
+        return text
+
+
+def words(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1] / len(ref)
+
+
+def _bench(directory, backend_name, frame_ms=30):
+    backend = BACKENDS[backend_name]()
+    started = time.perf_counter()
+    backend.setup()
+    print(f"{backend_name}: setup + warm-up {(time.perf_counter() - started) * 1000:.0f} ms")
+    fixtures = sorted(f for f in os.listdir(directory) if f.endswith(".wav"))
+    total_errors = total_words = 0
+    latencies = []
+    for name in fixtures:
+        transcript_path = os.path.join(directory, name[:-4] + ".txt")
+        if not os.path.exists(transcript_path):
+            continue
+        with open(transcript_path, encoding="utf-8") as f:
+            reference = f.read().strip()
+        with wave.open(os.path.join(directory, name), "rb") as wav:
+            rate, width = wav.getframerate(), wav.getsampwidth()
+            pcm = wav.readframes(wav.getnframes())
+        first_partial = None
+        try:
+            if backend.streaming:
+                # Frames are fed as fast as possible; latency is the time to
+                # finalize once the last frame is in, as in live use.
+                if width != 2:
+                    raise RecognizerError(f"{name} is {width * 8}-bit; Vosk needs 16-bit audio")
+                step = int(rate * frame_ms / 1000) * width
+                backend.begin(rate)
+                feed_start = time.perf_counter()
+                for i in range(0, len(pcm), step):
+                    if backend.feed(pcm[i:i + step]) and first_partial is None:
+                        first_partial = (i + step) / (rate * width)
+                final_start = time.perf_counter()
+                hypothesis = backend.finish()
+                decode_ms = (final_start - feed_start) * 1000
+            else:
+                final_start = time.perf_counter()
+                hypothesis = backend.transcribe(pcm, rate, width)
+                decode_ms = 0.0
+        except (SpeechNotRecognized, RecognizerError) as e:
+            hypothesis = ""
+            print(f"  {name}: {type(e).__name__} {e}")
+        latency = (time.perf_counter() - final_start) * 1000
+        latencies.append(latency)
+        wer = word_error_rate(reference, hypothesis)
+        total_errors += wer * len(words(reference))
+        total_words += len(words(reference))
+        partial = f", first partial at {first_partial:.2f}s of audio" if first_partial is not None else ""
+        print(f"  {name}: final {latency:.0f} ms (decode {decode_ms:.0f} ms{partial}), WER {wer:.0%} -> {hypothesis!r}")
+    if not latencies:
+        print("No fixtures found (need name.wav + name.txt pairs).")
+        return
+    latencies.sort()
+    print(f"{len(latencies)} files: median final latency {latencies[len(latencies) // 2]:.0f} ms, "
+          f"max {latencies[-1]:.0f} ms, WER {total_errors / max(1, total_words):.1%}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    backend_arg = "vosk"
+    if "--backend" in args:
+        i = args.index("--backend")
+        backend_arg = args[i + 1]
+        del args[i:i + 2]
+    _bench(args[0] if args else "fixtures", backend_arg)
@@ -0,0 +1,147 @@
+"""
+TTL result cache for read-only tools. Results are kept in a per-tool LRU
+and in a small SQLite file so repeat questions answer instantly across
+restarts, and concurrent identical calls share a single execution.
+Tools with side effects (opening apps, volume, ...) must not be wrapped.
+"""
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_cache.db")
+
+# tool name -> (ttl seconds, max entries)
+CACHE_POLICIES = {
+    "check_weather": (10 * 60, 64),
+    "search_wikipedia": (7 * 24 * 3600, 256),
+}
+
+ERROR_PREFIXES = ("error", "connection error", "i couldn't", "no wikipedia", "could not")
+
+
+def is_cacheable_result(result):
+    return isinstance(result, str) and not result.lower().startswith(ERROR_PREFIXES)
+
+
+class _Store:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = None
+        if not path:
+            return
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tool_results (tool TEXT, key TEXT, stored_at REAL, value TEXT, PRIMARY KEY (tool, key))")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Tool cache disabled: {e}")
+            self._conn = None
+
+    def load(self, tool, ttl, limit):
+        if self._conn is None:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, stored_at, value FROM tool_results WHERE tool = ? AND stored_at > ? ORDER BY stored_at DESC LIMIT ?",
+                (tool, time.time() - ttl, limit),
+            ).fetchall()
+
+    def save(self, tool, key, stored_at, value):
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?)", (tool, key, stored_at, json.dumps(value)))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Tool cache error: {e}")
+
+
+class ToolCache:
+    def __init__(self, func, ttl, max_size, store):
+        self.func = func
+        self.name = func.__name__
+        self.ttl = ttl
+        self.max_size = max_size
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        for key, stored_at, value in reversed(store.load(self.name, ttl, max_size)):
+            self._entries[key] = (stored_at, json.loads(value))
+
+    @staticmethod
+    def make_key(args, kwargs):
+        def norm(v):
+            return " ".join(v.lower().split()) if isinstance(v, str) else v
+        return json.dumps([[norm(a) for a in args], {k: norm(v) for k, v in sorted(kwargs.items())}])
+
+    def __call__(self, *args, **kwargs):
+        key = self.make_key(args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            waiter = self._in_flight.get(key)
+            if waiter is None:
+                waiter = self._in_flight[key] = {"event": threading.Event(), "result": None, "error": None}
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.shared += 1
+        if not owner:
+            waiter["event"].wait()
+            if waiter["error"] is not None:
+                raise waiter["error"]
+            return waiter["result"]
+        result = None
+        stored_at = time.time()
+        try:
+            result = waiter["result"] = self.func(*args, **kwargs)
+        except Exception as e:
+            waiter["error"] = e
+            raise
+        finally:
+            # Publish to the cache before releasing waiters so late callers hit it.
+            with self._lock:
+                if waiter["error"] is None and is_cacheable_result(result):
+                    self._entries[key] = (stored_at, result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                self._in_flight.pop(key, None)
+            waiter["event"].set()
+        if is_cacheable_result(result):
+            self.store.save(self.name, key, stored_at, result)
+        return result
+
+
+def _wrap(func, cache):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return cache(*args, **kwargs)
+    wrapper.cache = cache
+    return wrapper
+
+
+def cache_tools(tools, policies=CACHE_POLICIES, path=CACHE_FILENAME):
+    """Returns the tool list with read-only tools wrapped in a TTL cache."""
+    store = _Store(path)
+    wrapped = []
+    for func in tools:
+        policy = policies.get(func.__name__)
+        if policy is None:
+            wrapped.append(func)
+            continue
+        wrapped.append(_wrap(func, ToolCache(func, policy[0], policy[1], store)))
+    return wrapped
@@ -0,0 +1,141 @@
+"""
+Runs the function calls from one model turn. Read-only tools run in
+parallel on a bounded pool; tools that change the PC run one after another
+in the order the model asked for them. Results come back in call order and
+every call's latency is recorded.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from streaming import FINAL_ROUND, MAX_TOOL_ROUNDS, function_response_parts
+
+PARALLEL_SAFE = {"check_weather", "search_wikipedia", "get_time", "get_date"}
+DEFAULT_TIMEOUT = 10.0
+TIMEOUTS = {"check_weather": 8.0, "search_wikipedia": 8.0, "play_youtube": 15.0, "open_app": 15.0}
+
+
+class ToolStats:
+    __slots__ = ("calls", "errors", "total_s", "max_s")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+
+class _Job:
+    """Tracks when a submitted call started running and whether the caller gave up on it."""
+    __slots__ = ("started", "start", "finished", "timed_out")
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.start = None
+        self.finished = False
+        self.timed_out = False
+
+
+class ToolExecutor:
+    def __init__(self, tools_by_name, max_workers=4, timeouts=TIMEOUTS, default_timeout=DEFAULT_TIMEOUT):
+        self.tools_by_name = tools_by_name
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+        self.stats = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._serial = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-serial")
+        self._lock = threading.Lock()
+
+    def _record(self, name, elapsed, failed, job=None):
+        with self._lock:
+            # A call that outlived its timeout is recorded once, as failed, when it ends.
+            if job is not None:
+                job.finished = True
+                failed = failed or job.timed_out
+            stats = self.stats.setdefault(name, ToolStats())
+            stats.calls += 1
+            stats.errors += 1 if failed else 0
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+
+    def _call(self, name, kwargs, job=None):
+        func = self.tools_by_name.get(name)
+        start = time.perf_counter()
+        if job is not None:
+            job.start = start
+            job.started.set()
+        failed = False
+        try:
+            if func is None:
+                failed = True
+                return f"Unknown tool: {name}"
+            return func(**kwargs)
+        except Exception as e:
+            failed = True
+            return f"Error running {name}: {e}"
+        finally:
+            self._record(name, time.perf_counter() - start, failed, job)
+
+    def run(self, calls):
+        """
+        Executes function calls and returns their results in the same order.
+        Each call's timeout counts from when it starts running, not from when
+        it was queued; a call still waiting for a free worker after its timeout
+        is cancelled.
+        """
+        jobs = []
+        for call in calls:
+            pool = self._pool if call.name in PARALLEL_SAFE else self._serial
+            job = _Job()
+            jobs.append((job, pool.submit(self._call, call.name, dict(call.args or {}), job)))
+        results = []
+        for call, (job, future) in zip(calls, jobs):
+            timeout = self.timeouts.get(call.name, self.default_timeout)
+            if not job.started.wait(timeout):
+                if future.cancel():
+                    self._record(call.name, 0.0, True)
+                    results.append(f"Error: {call.name} could not start within {timeout:.0f} seconds.")
+                    continue
+                # It was picked up just now.
+                job.started.wait()
+            remaining = max(0.0, timeout - (time.perf_counter() - job.start))
+            try:
+                results.append(future.result(timeout=remaining))
+            except TimeoutError:
+                with self._lock:
+                    job.timed_out = not job.finished
+                if not job.timed_out:
+                    results.append(future.result())
+                    continue
+                results.append(f"Error: {call.name} timed out after {timeout:.0f} seconds.")
+        return results
+
+    def prefetch(self, func, **kwargs):
+        """Runs a read-only call in the background, e.g. to warm its cache."""
+        self._pool.submit(func, **kwargs)
+
+    def report(self):
+        with self._lock:
+            return ", ".join(
+                f"{name} {s.calls}x avg {s.total_s / s.calls * 1000:.0f} ms max {s.max_s * 1000:.0f} ms"
+                for name, s in self.stats.items() if s.calls
+            )
+
+
+def complete_turn(chat, user_input, executor):
+    """
+    Non-streaming turn with manual function calling: every round of function
+    calls from the model is executed by the executor and sent back, the last
+    allowed round with tool calls disabled. Returns the reply text ("" if
+    the model gave none).
+    """
+    response = chat.send_message(user_input)
+    for round_number in range(1, MAX_TOOL_ROUNDS + 1):
+        calls = [part.function_call for part in response.parts
+                 if part.function_call and part.function_call.name]
+        if not calls:
+            break
+        options = FINAL_ROUND if round_number == MAX_TOOL_ROUNDS else {}
+        response = chat.send_message(function_response_parts(calls, executor.run(calls)), **options)
+    # response.text raises when the reply has no text parts.
+    return "".join(part.text for part in response.parts if part.text)
@@ -0,0 +1,72 @@
+"""
+Deferred imports for the tools' heavy dependencies. Tool functions keep
+their plain signatures (which is all Gemini needs to build declarations),
+while pyautogui, wikipedia, pywhatkit and friends are only imported on the
+first call that uses them, or by warm_up() once the window is showing.
+"""
+import importlib
+import threading
+import time
+
+MODULES = {}
+import_times = {}
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access."""
+
+    def __init__(self, name, warm=True):
+        self._name = name
+        self._warm = warm
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_times[self._name] = time.perf_counter() - start
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy(name, warm=True):
+    """
+    Returns a LazyModule for name. Modules with warm=False (e.g. ones that
+    touch the network on import) are skipped by warm_up().
+    """
+    module = MODULES.get(name)
+    if module is None:
+        module = MODULES[name] = LazyModule(name, warm)
+    return module
+
+
+def warm_up(names=None, on_done=None):
+    """Imports the registered modules on a background thread."""
+    def run():
+        for name, module in list(MODULES.items()):
+            wanted = module._warm if names is None else name in names
+            if not wanted:
+                continue
+            try:
+                module._load()
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+        if on_done:
+            on_done()
+    thread = threading.Thread(target=run, name="tool-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def report():
+    return ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in import_times.items())
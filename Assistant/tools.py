@@ -1,23 +1,39 @@
 import os
+import sys
 import time
 import threading
-from AppOpener import open as app_open, close as app_close, mklist
 import voice
+from app_index import AppIndex
+from tool_registry import lazy
 import datetime
-import pyautogui
-import screen_brightness_control as sbc
 import webbrowser
-import wikipedia
-import pywhatkit
-import requests 
+# Heavy dependencies are imported on first use (see tool_registry).
+AppOpener = lazy("AppOpener")
+pyautogui = lazy("pyautogui")
+sbc = lazy("screen_brightness_control")
+wikipedia = lazy("wikipedia")
+# pywhatkit goes online when imported, so it is not warmed up in the background.
+pywhatkit = lazy("pywhatkit", warm=False)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import http_client
+
+http_client.get_client().set_timeout("wttr.in", (3.05, 8))
+
+app_index = AppIndex()
+
+def _resolve_app(app_name):
+    """Maps a spoken app name to the installed app name, building the index on first use."""
+    app_index.start_background_refresh()
+    return app_index.best_match(app_name)
 
 def open_app(app_name: str):
     """Opens an app (e.g., 'spotify', 'chrome')."""
-    if not os.path.exists("app_data.json"):
-        mklist(name="app_data.json")
     try:
-        app_open(app_name, match_closest=True, output=False)
-        return f"Opening {app_name}..."
+        name = _resolve_app(app_name)
+        if name is None:
+            return f"I couldn't find an app called {app_name}."
+        AppOpener.open(name, output=False)
+        return f"Opening {name}..."
     except Exception as e:
         return f"Error opening {app_name}: {e}"
 
@@ -27,8 +43,11 @@ def close_app(app_name: str):
     Args: app_name (str) - The name of the app to close.
     """
     try:
-        app_close(app_name, match_closest=True, output=False)
-        return f"Closing {app_name}..."
+        name = _resolve_app(app_name)
+        if name is None:
+            return f"I couldn't find an app called {app_name}."
+        AppOpener.close(name, output=False)
+        return f"Closing {name}..."
     except Exception as e:
         return f"Could not close {app_name}. Error: {e}"
 
@@ -86,7 +105,7 @@ def check_weather(city: str):
     Args: city (str) - The city name.
     """
     try:
-        response = requests.get(f"https://wttr.in/{city}?format=%C+%t")
+        response = http_client.get(f"https://wttr.in/{city}?format=%C+%t")
         if response.status_code == 200:
             result = response.text.strip()
             return f"The weather in {city} is {result}."
@@ -0,0 +1,133 @@
+"""
+Thread-safe UI updates for the Vecna window. Background threads post events
+to a queue; the Tk main loop drains it with after() at a fixed frame rate,
+keeps only the newest status text, writes all new transcript text with a
+single insert and trims the chat area to a line cap. The full transcript
+is appended to an on-disk log.
+"""
+import os
+import queue
+import time
+import tkinter as tk
+
+TRANSCRIPT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vecna_transcript.log")
+
+STATUS = "status"
+TEXT = "text"
+CALL = "call"
+
+
+class UIEventBus:
+    def __init__(self, root, status_label, chat_area, fps=30, max_lines=500, log_path=TRANSCRIPT_FILENAME):
+        self.root = root
+        self.status_label = status_label
+        self.chat_area = chat_area
+        self.interval_ms = max(1, int(1000 / fps))
+        self.max_lines = max_lines
+        self.log_path = log_path
+        self.frames = 0
+        self.events = 0
+        self.max_batch = 0
+        self._queue = queue.SimpleQueue()
+        self._status = None
+        self._log = None
+        if log_path:
+            try:
+                self._log = open(log_path, "a", encoding="utf-8")
+                self._log.write(f"\n--- session {time.strftime('%Y-%m-%d %H:%M:%S')} ---\n")
+            except OSError as e:
+                print(f"Transcript log disabled: {e}")
+        self._after_id = None
+        self._stopped = False
+
+    # Safe to call from any thread.
+    def status(self, text):
+        self._queue.put((STATUS, text))
+
+    def text(self, text):
+        self._queue.put((TEXT, text))
+
+    def message(self, sender, message):
+        self._queue.put((TEXT, f"{sender}: {message}\n"))
+
+    def call(self, func, *args):
+        """Runs func(*args) on the Tk thread after the pending updates."""
+        self._queue.put((CALL, (func, args)))
+
+    # Tk thread only.
+    def start(self):
+        self._stopped = False
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+        return self
+
+    def stop(self):
+        # stop() may run from a call inside _drain, whose after() can't be cancelled yet.
+        self._stopped = True
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._drain_once()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _flush(self, chunks, status):
+        if chunks:
+            text = "".join(chunks)
+            self.chat_area.insert(tk.END, text)
+            self._trim()
+            self.chat_area.see(tk.END)
+            if self._log is not None:
+                self._log.write(text)
+                self._log.flush()
+        if status is not None and status != self._status:
+            self._status = status
+            self.status_label.config(text=f"Status: {status}")
+
+    def _drain_once(self):
+        chunks = []
+        status = None
+        count = 0
+        while True:
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+            if kind == STATUS:
+                status = value
+            elif kind == TEXT:
+                chunks.append(value)
+            else:
+                # Keep ordering: apply what came before the call first.
+                self._flush(chunks, status)
+                chunks, status = [], None
+                func, args = value
+                func(*args)
+        self._flush(chunks, status)
+        if count:
+            self.frames += 1
+            self.events += count
+            self.max_batch = max(self.max_batch, count)
+
+    def _drain(self):
+        try:
+            self._drain_once()
+        except Exception as e:
+            print(f"UI update failed: {e}")
+        if self._stopped:
+            self._after_id = None
+            return
+        self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _trim(self):
+        # "end-1c" skips the trailing newline Tk always keeps.
+        lines = int(self.chat_area.index("end-1c").split(".")[0])
+        excess = lines - self.max_lines
+        if excess > 0:
+            self.chat_area.delete("1.0", f"{excess + 1}.0")
+
+    def stats(self):
+        avg = self.events / self.frames if self.frames else 0.0
+        return f"{self.events} UI events in {self.frames} frames (avg {avg:.1f}, max {self.max_batch})"
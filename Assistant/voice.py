@@ -1,18 +1,267 @@
-import win32com.client
-import pythoncom
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+
+class NullBackend:
+    """Prints instead of speaking. Used for headless runs and tests."""
+    name = "null"
+
+    def __init__(self, words_per_second=0.0):
+        self.words_per_second = words_per_second
+
+    def setup(self):
+        pass
+
+    def speak(self, text, started, should_stop):
+        started()
+        if not self.words_per_second:
+            return
+        end = time.perf_counter() + len(text.split()) / self.words_per_second
+        while time.perf_counter() < end:
+            if should_stop():
+                return
+            time.sleep(0.02)
+
+    def teardown(self):
+        pass
+
+
+class SapiBackend:
+    """Windows SAPI5 voice, created once on the speech thread."""
+    name = "sapi"
+    SVSF_ASYNC = 1
+    SVSF_PURGE = 2
+
+    def setup(self):
+        import pythoncom
+        import win32com.client
+        self._pythoncom = pythoncom
+        pythoncom.CoInitialize()
+        self.speaker = win32com.client.Dispatch("SAPI.SpVoice")
+        self.speaker.Rate = 1
+
+    def speak(self, text, started, should_stop):
+        self.speaker.Speak(text, self.SVSF_ASYNC)
+        started()
+        while not self.speaker.WaitUntilDone(30):
+            if should_stop():
+                self.speaker.Speak("", self.SVSF_ASYNC | self.SVSF_PURGE)
+                return
+
+    def teardown(self):
+        self.speaker = None
+        self._pythoncom.CoUninitialize()
+
+
+class EspeakBackend:
+    """espeak / espeak-ng command line, one process per utterance."""
+    name = "espeak"
+
+    def setup(self):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak not found")
+
+    def speak(self, text, started, should_stop):
+        proc = subprocess.Popen([self.binary, text], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        started()
+        while proc.poll() is None:
+            if should_stop():
+                proc.terminate()
+                return
+            time.sleep(0.02)
+
+    def teardown(self):
+        pass
+
+
+class Pyttsx3Backend:
+    name = "pyttsx3"
+
+    def setup(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self._started = None
+        self._should_stop = None
+        self.engine.connect("started-utterance", lambda name: self._started and self._started())
+        self.engine.connect("started-word", self._on_word)
+
+    def _on_word(self, name, location, length):
+        if self._should_stop and self._should_stop():
+            self.engine.stop()
+
+    def speak(self, text, started, should_stop):
+        self._started = started
+        self._should_stop = should_stop
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def teardown(self):
+        self.engine.stop()
+
+
+BACKENDS = {
+    "sapi": SapiBackend,
+    "pyttsx3": Pyttsx3Backend,
+    "espeak": EspeakBackend,
+    "null": NullBackend,
+}
+
+
+def default_backend_name():
+    name = os.getenv("VECNA_TTS")
+    if name:
+        return name
+    if sys.platform == "win32":
+        return "sapi"
+    return "espeak" if (shutil.which("espeak-ng") or shutil.which("espeak")) else "null"
+
+
+class Utterance:
+    __slots__ = ("text", "enqueued_at", "first_audio_ms", "cancelled", "done")
+
+    def __init__(self, text):
+        self.text = text
+        self.enqueued_at = time.perf_counter()
+        self.first_audio_ms = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def wait_started(self, timeout=None):
+        """Waits until audio has started (True) or the utterance ended / timed out (False)."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.first_audio_ms is None and not self.done.is_set():
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            time.sleep(0.01)
+        return self.first_audio_ms is not None
+
+
+class SpeechWorker:
+    """
+    Long-lived TTS engine on its own thread. Utterances are queued with say()
+    and can be cut short with interrupt() (barge-in). Each utterance records
+    its time to first audio.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or BACKENDS[default_backend_name()]()
+        self.timings = []
+        self._queue = queue.Queue()
+        self._current = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.backend.setup()
+        except Exception as e:
+            print(f"Voice Error: {e}. Falling back to text only.")
+            self.backend = NullBackend()
+        self._ready.set()
+        while True:
+            utterance = self._queue.get()
+            if utterance is None:
+                break
+            if utterance.cancelled:
+                utterance.done.set()
+                continue
+            self._current = utterance
+            try:
+                self.backend.speak(
+                    utterance.text,
+                    lambda: self._started(utterance),
+                    lambda: utterance.cancelled,
+                )
+            except Exception as e:
+                print(f"Voice Error: {e}")
+            finally:
+                self._current = None
+                utterance.done.set()
+        self.backend.teardown()
+
+    def _started(self, utterance):
+        if utterance.first_audio_ms is None:
+            utterance.first_audio_ms = (time.perf_counter() - utterance.enqueued_at) * 1000
+            self.timings.append(utterance.first_audio_ms)
+            del self.timings[:-100]
+
+    @property
+    def is_speaking(self):
+        return self._current is not None or not self._queue.empty()
+
+    def say(self, text):
+        """Queues text and returns immediately with its Utterance."""
+        print(f"Assistant: {text}")
+        utterance = Utterance(text)
+        self._queue.put(utterance)
+        return utterance
+
+    def speak(self, text):
+        """Queues text and waits until it has been spoken (or interrupted)."""
+        utterance = self.say(text)
+        utterance.done.wait()
+        return utterance
+
+    def interrupt(self):
+        """Stops the current utterance and drops everything queued."""
+        while True:
+            try:
+                utterance = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if utterance is None:
+                self._queue.put(None)
+                break
+            utterance.cancelled = True
+            utterance.done.set()
+        current = self._current
+        if current is not None:
+            current.cancelled = True
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.is_speaking:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def close(self):
+        self.interrupt()
+        self._queue.put(None)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SpeechWorker()
+        return _worker
+
 
 def speak(text):
     """
-    Speaks text using Windows SAPI5. 
-    BLOCKING: The code waits here until speaking is done.
+    Speaks text on the shared speech thread.
+    BLOCKING: The code waits here until speaking is done or interrupted.
     """
-    print(f"Assistant: {text}")
-    try:
-        pythoncom.CoInitialize()
-        speaker = win32com.client.Dispatch("SAPI.SpVoice")
-        speaker.Rate = 1 
-        speaker.Speak(text)
-    except Exception as e:
-        print(f"Voice Error: {e}")
-    finally:
-        pythoncom.CoUninitialize()
\ No newline at end of file
+    get_worker().speak(text)
+
+
+def say(text):
+    """Queues text without waiting for it to be spoken."""
+    return get_worker().say(text)
+
+
+def interrupt():
+    get_worker().interrupt()
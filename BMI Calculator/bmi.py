@@ -1,28 +1,15 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import sqlite3
-import csv
 from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.gradient import GradientBackground
+from bmi_store import BMIRepository, get_bmi_data
+from bmi_transfer import export_csv, import_csv
 
 DB_FILENAME = "bmi_data.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_FILENAME)
-    c = conn.cursor()
-    c.execute(""" CREATE TABLE IF NOT EXISTS bmi_entries (id INTEGER PRIMARY KEY AUTOINCREMENT,username TEXT,recorded_at TEXT,weight_kg REAL,height_cm REAL,bmi REAL,category TEXT);""")
-    conn.commit()
-    conn.close()
-
-def get_bmi_data(bmi):
-    if bmi < 18.5:
-        return "Underweight", "#6A99D5"  
-    elif bmi < 25:
-        return "Normal", "#6DBC70"     
-    elif bmi < 30:
-        return "Overweight", "#FFD700"  
-    else:
-        return "Obese", "#E06666"       
-
 class BMIResultDialog(tk.Toplevel):
     def __init__(self, parent, bmi_value, category, color):
         tk.Toplevel.__init__(self, parent)
@@ -82,24 +69,7 @@ class GradientFrame(tk.Canvas):
         tk.Canvas.__init__(self, parent, **kwargs)
         self.color1 = color1
         self.color2 = color2
-        self.bind("<Configure>", self._draw_gradient)
-
-    def _draw_gradient(self, event=None):
-        self.delete("gradient")
-        width = self.winfo_width()
-        height = self.winfo_height()
-        (r1, g1, b1) = self.winfo_rgb(self.color1)
-        (r2, g2, b2) = self.winfo_rgb(self.color2)
-        r_ratio = (r2 - r1) / height
-        g_ratio = (g2 - g1) / height
-        b_ratio = (b2 - b1) / height
-        for i in range(height):
-            nr = int(r1 + (r_ratio * i))
-            ng = int(g1 + (g_ratio * i))
-            nb = int(b1 + (b_ratio * i))
-            color = f"#{nr//256:02x}{ng//256:02x}{nb//256:02x}"
-            self.create_line(0, i, width, i, tags=("gradient"), fill=color)
-        self.lower("gradient")
+        self.gradient = GradientBackground(self, color1, color2)
 
 class BMICalculatorApp(tk.Tk):
     def __init__(self):
@@ -107,7 +77,10 @@ class BMICalculatorApp(tk.Tk):
         self.title("BMI Calculator")
         self.geometry("650x650")
         self.resizable(False, False)
-        init_db()
+        self.repo = BMIRepository(DB_FILENAME)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Created on first "Trends" click; imports numpy/matplotlib only then.
+        self.trend_panel = None
         self.style_widgets()
         self.bg = GradientFrame(self, "#74ebd5", "#ACB6E5")  
         self.bg.pack(fill="both", expand=True)
@@ -169,6 +142,12 @@ class BMICalculatorApp(tk.Tk):
         ttk.Button(btn_frame, text="Export CSV",
                    style="Glow.TButton",
                    command=self.export_history_csv).grid(row=0, column=1, padx=10)
+        ttk.Button(btn_frame, text="Import CSV",
+                   style="Glow.TButton",
+                   command=self.import_history_csv).grid(row=0, column=2, padx=10)
+        ttk.Button(btn_frame, text="Trends",
+                   style="Glow.TButton",
+                   command=self.show_trends).grid(row=0, column=3, padx=10)
 
     def _entry(self, parent, label):
         parent.grid_columnconfigure(0, weight=1) 
@@ -179,13 +158,12 @@ class BMICalculatorApp(tk.Tk):
         self.input_row_counter += 1
         return e
 
+    def on_close(self):
+        self.repo.close()
+        self.destroy()
+
     def populate_user_list(self):
-        conn = sqlite3.connect(DB_FILENAME)
-        c = conn.cursor()
-        c.execute("SELECT DISTINCT username FROM bmi_entries ORDER BY username")
-        users = [u[0] for u in c.fetchall()]
-        conn.close()
-        self.user_combobox["values"] = users
+        self.user_combobox["values"] = self.repo.list_users()
 
     def calculate_bmi(self):
         username = self.entry_username.get().strip()
@@ -202,12 +180,7 @@ class BMICalculatorApp(tk.Tk):
             return
         bmi = weight / ((height / 100) ** 2) 
         cat, color = get_bmi_data(bmi)
-        conn = sqlite3.connect(DB_FILENAME)
-        c = conn.cursor()
-        c.execute(""" INSERT INTO bmi_entries (username, recorded_at, weight_kg, height_cm, bmi, category) VALUES (?, ?, ?, ?, ?, ?)""",
-                  (username, datetime.now().isoformat(), weight, height, bmi, cat))
-        conn.commit()
-        conn.close()
+        self.repo.add_entry(username, datetime.now().isoformat(), weight, height, bmi, cat)
         BMIResultDialog(self, bmi, cat, color)
         self.populate_user_list()
         self.user_combobox.set(username)
@@ -219,15 +192,11 @@ class BMICalculatorApp(tk.Tk):
             self.stat_latest.config(text="Latest BMI: -")
             self.stat_trend.config(text="Trend: -")
             return
-        conn = sqlite3.connect(DB_FILENAME)
-        c = conn.cursor()
-        c.execute("SELECT bmi FROM bmi_entries WHERE username = ? ORDER BY recorded_at", (username,))
-        bmis = [r[0] for r in c.fetchall()]
-        conn.close()
-        if not bmis:
+        stats = self.repo.user_stats(username)
+        if stats is None:
             return
-        latest = bmis[-1]
-        trend_delta = latest - bmis[0]
+        latest = stats.latest_bmi
+        trend_delta = latest - stats.first_bmi
         if abs(trend_delta) < 0.2:
             trend = "Stable"
         elif trend_delta > 0:
@@ -236,6 +205,22 @@ class BMICalculatorApp(tk.Tk):
             trend = f"Decreasing ({trend_delta:.2f})"
         self.stat_latest.config(text=f"Latest BMI: {latest:.2f} ({get_bmi_data(latest)[0]})")
         self.stat_trend.config(text=f"Trend: {trend}")
+        if self.trend_panel is not None and self.trend_panel.winfo_viewable():
+            self.trend_panel.update_user(username)
+
+    def show_trends(self):
+        username = self.user_combobox.get()
+        if not username:
+            messagebox.showinfo("Info", "Select a user to see trends.")
+            return
+        if self.trend_panel is None:
+            try:
+                from bmi_chart import TrendPanel
+            except ImportError as e:
+                messagebox.showerror("Error", f"Trend charts need numpy and matplotlib ({e}).")
+                return
+            self.trend_panel = TrendPanel(self, self.repo)
+        self.trend_panel.show(username)
 
     def delete_user_history(self):
         username = self.user_combobox.get()
@@ -243,11 +228,7 @@ class BMICalculatorApp(tk.Tk):
             messagebox.showinfo("Info", "No user selected.")
             return
         if messagebox.askyesno("Confirm", f"Delete all history for '{username}'?"):
-            conn = sqlite3.connect(DB_FILENAME)
-            c = conn.cursor()
-            c.execute("DELETE FROM bmi_entries WHERE username = ?", (username,))
-            conn.commit()
-            conn.close()
+            self.repo.delete_user(username)
             self.populate_user_list()
             self.user_combobox.set("")
             self.load_statistics()
@@ -258,13 +239,7 @@ class BMICalculatorApp(tk.Tk):
         if not username:
             messagebox.showinfo("Info", "Select a user to export data.")
             return
-        conn = sqlite3.connect(DB_FILENAME)
-        c = conn.cursor()
-        c.execute("""SELECT id, username, recorded_at, weight_kg, height_cm, bmi, category FROM bmi_entries WHERE username = ? ORDER BY recorded_at ASC """,
-                  (username,))
-        rows = c.fetchall()
-        conn.close()
-        if not rows:
+        if self.repo.user_stats(username) is None:
             messagebox.showinfo("No Data", "No history to export.")
             return
         file_path = filedialog.asksaveasfilename(
@@ -274,10 +249,25 @@ class BMICalculatorApp(tk.Tk):
         )
         if not file_path:
             return
-        with open(file_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Username", "Recorded At", "Weight (kg)", "Height (cm)", "BMI", "Category"])
-            writer.writerows(rows)
+        export_csv(self.repo, file_path, [username])
         messagebox.showinfo("Exported", "CSV file saved successfully.")
+
+    def import_history_csv(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if not file_path:
+            return
+        try:
+            result = import_csv(self.repo, file_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Failed", str(e))
+            return
+        self.populate_user_list()
+        self.load_statistics()
+        message = f"{result.imported} entries imported."
+        if result.duplicates:
+            message += f"\n{result.duplicates} entries were already in the history and were skipped."
+        if result.rejected:
+            message += f"\n{result.rejected} rows skipped:\n" + "\n".join(result.errors[:5])
+        messagebox.showinfo("Imported", message)
 if __name__ == "__main__":
     BMICalculatorApp().mainloop()
\ No newline at end of file
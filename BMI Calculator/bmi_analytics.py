@@ -0,0 +1,232 @@
+"""
+Trend analytics for BMI history with NumPy. A user's history (or the whole
+database) is read with one query into column arrays, and every statistic is
+computed with array operations, never a Python loop over rows. Population
+figures use the per-user summary table, so they cost one row per user.
+
+    python bmi_analytics.py [bmi_data.db]     (population report with timings)
+    python bmi_analytics.py --bench 2000000   (same, on a synthetic database)
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bmi_store import BMIRepository
+
+CATEGORIES = ("Underweight", "Normal", "Overweight", "Obese")
+CATEGORY_BOUNDS = np.array([18.5, 25.0, 30.0])
+PERCENTILES = (5, 25, 50, 75, 95)
+SECONDS_PER_WEEK = 7 * 24 * 3600
+# SQLite converts recorded_at to epoch seconds so NumPy receives plain numbers.
+ROW_DTYPE = np.dtype([("epoch", "i8"), ("bmi", "f8")])
+EPOCH = "CAST(strftime('%s', recorded_at) AS INTEGER)"
+
+
+class History:
+    """
+    Column arrays for BMI entries sorted by user, then time. group holds a
+    user index per entry (into users); starts/counts delimit each user's run.
+    """
+
+    def __init__(self, users, counts, epoch, bmi):
+        self.users = list(users)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1])).astype(np.int64)
+        self.group = np.repeat(np.arange(len(self.users)), self.counts)
+        self.times = epoch.astype("datetime64[s]")
+        self.bmi = bmi
+
+    def __len__(self):
+        return len(self.bmi)
+
+    @property
+    def weeks(self):
+        """Entry times in weeks since the epoch (float)."""
+        return self.times.astype(np.int64) / SECONDS_PER_WEEK
+
+
+def _fetch_columns(cursor):
+    rows = np.fromiter(cursor, dtype=ROW_DTYPE)
+    return rows["epoch"], rows["bmi"]
+
+
+def load_user(repo, username):
+    cursor = repo.conn.execute(
+        f"SELECT {EPOCH}, bmi FROM bmi_entries WHERE username = ? ORDER BY recorded_at", (username,))
+    epoch, bmi = _fetch_columns(cursor)
+    return History([username], [len(bmi)], epoch, bmi)
+
+
+def load_all(repo):
+    """
+    Loads every entry. User boundaries come from the per-user entry counts in
+    the summary table, so usernames don't have to be read for every row.
+    """
+    users, counts = [], []
+    for username, count in repo.conn.execute("SELECT username, entry_count FROM bmi_user_stats ORDER BY username"):
+        users.append(username)
+        counts.append(count)
+    cursor = repo.conn.execute(f"SELECT {EPOCH}, bmi FROM bmi_entries ORDER BY username, recorded_at")
+    epoch, bmi = _fetch_columns(cursor)
+    # fromiter is not given the expected count: it would fail with its own
+    # error on a short read and silently truncate a long one.
+    if len(bmi) != sum(counts):
+        raise ValueError("bmi_user_stats is out of date; run python bmi_store.py --repair")
+    return History(users, counts, epoch, bmi)
+
+
+def categories(bmi):
+    """Category index per value (0 = Underweight ... 3 = Obese), matching get_bmi_data."""
+    return np.searchsorted(CATEGORY_BOUNDS, bmi, side="right")
+
+
+def rolling_mean(history, window=7):
+    """Mean of each entry and up to window-1 entries before it, within the same user."""
+    index = np.arange(len(history))
+    first = np.maximum(index - window + 1, history.starts[history.group])
+    sums = np.concatenate(([0.0], np.cumsum(history.bmi)))
+    return (sums[index + 1] - sums[first]) / (index - first + 1)
+
+
+def _grouped_slopes(keys, x, y, n_groups):
+    """Least-squares slope of y over x for each key; NaN where it is undefined."""
+    n = np.bincount(keys, minlength=n_groups).astype(float)
+    sx = np.bincount(keys, x, n_groups)
+    sy = np.bincount(keys, y, n_groups)
+    sxx = np.bincount(keys, x * x, n_groups)
+    sxy = np.bincount(keys, x * y, n_groups)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = (n * sxy - sx * sy) / denominator
+    slopes[(n < 2) | (np.abs(denominator) < 1e-12)] = np.nan
+    return slopes
+
+
+def trend_slopes(history):
+    """BMI change per week for each user (least squares over the whole history)."""
+    weeks = history.weeks
+    # Centering per user keeps the sums small enough to stay precise.
+    weeks = weeks - weeks[history.starts][history.group] if len(history) else weeks
+    return _grouped_slopes(history.group, weeks, history.bmi, len(history.users))
+
+
+def weekly_trend(history, user=0):
+    """
+    Returns (week_start, mean_bmi, slope_per_week) for each calendar week a
+    user has entries in; the slope is fitted to the entries of that week.
+    """
+    part = slice(history.starts[user], history.starts[user] + history.counts[user])
+    times = history.times[part]
+    weeks = history.weeks[part]
+    bmi = history.bmi[part]
+    # datetime64[W] weeks begin on Thursday (1970-01-01); shift so they begin on Monday.
+    monday = np.timedelta64(3, "D")
+    week_start = (times + monday).astype("datetime64[W]").astype("datetime64[D]") - monday
+    labels, keys = np.unique(week_start, return_inverse=True)
+    counts = np.bincount(keys, minlength=len(labels))
+    means = np.bincount(keys, bmi, len(labels)) / np.maximum(counts, 1)
+    offsets = weeks - labels.astype("datetime64[s]").astype(np.int64)[keys] / SECONDS_PER_WEEK
+    return labels, means, _grouped_slopes(keys, offsets, bmi, len(labels))
+
+
+def category_transitions(history):
+    """4x4 counts of consecutive entries of the same user going from category i to j."""
+    codes = categories(history.bmi)
+    same_user = history.group[1:] == history.group[:-1]
+    pairs = codes[:-1][same_user] * 4 + codes[1:][same_user]
+    return np.bincount(pairs, minlength=16).reshape(4, 4)
+
+
+def latest_bmis(repo):
+    """Latest BMI of every user, from the summary table."""
+    cursor = repo.conn.execute("SELECT latest_bmi FROM bmi_user_stats")
+    return np.fromiter(cursor, dtype=[("bmi", "f8")])["bmi"]
+
+
+def population_percentiles(values, percentiles=PERCENTILES):
+    if not len(values):
+        return {}
+    return dict(zip(percentiles, np.percentile(values, percentiles)))
+
+
+def percentile_rank(values, value):
+    """Share of values (0-100) at or below value."""
+    if not len(values):
+        return float("nan")
+    return 100.0 * np.count_nonzero(values <= value) / len(values)
+
+
+def format_transitions(matrix):
+    width = max(len(c) for c in CATEGORIES) + 2
+    lines = [" " * width + "".join(f"{c[:5]:>8}" for c in CATEGORIES)]
+    for name, row in zip(CATEGORIES, matrix):
+        lines.append(f"{name:<{width}}" + "".join(f"{v:>8}" for v in row))
+    return "\n".join(lines)
+
+
+def report(repo):
+    def timed(label, func):
+        start = time.perf_counter()
+        result = func()
+        print(f"  {label:<26} {(time.perf_counter() - start) * 1000:9.1f} ms")
+        return result
+
+    print("Timings:")
+    history = timed("load all entries", lambda: load_all(repo))
+    timed("rolling mean (7)", lambda: rolling_mean(history))
+    slopes = timed("trend slope per user", lambda: trend_slopes(history))
+    transitions = timed("category transitions", lambda: category_transitions(history))
+    latest = timed("latest BMI per user", lambda: latest_bmis(repo))
+    percentiles = timed("percentiles", lambda: population_percentiles(latest))
+    if history.users:
+        timed("one user: load + weekly", lambda: weekly_trend(load_user(repo, history.users[0])))
+    print(f"{len(history)} entries, {len(history.users)} users")
+    if not len(history):
+        return
+    print("Latest BMI percentiles: " + ", ".join(f"p{p} {v:.1f}" for p, v in percentiles.items()))
+    finite = slopes[np.isfinite(slopes)]
+    if len(finite):
+        print(f"Trend per week: median {np.median(finite):+.3f}, "
+              f"{np.count_nonzero(finite > 0)} rising / {np.count_nonzero(finite < 0)} falling users")
+    print("Category transitions (from row to column):")
+    print(format_transitions(transitions))
+
+
+def _bench(rows, users=2000):
+    from bmi_store import INSERT_ENTRY
+    rng = np.random.default_rng(1)
+    user_ids = np.arange(rows) % users
+    minutes = np.arange(rows) * 7
+    times = (np.datetime64("2015-01-01T00:00:00") + minutes.astype("timedelta64[m]")).astype(str)
+    # Each user drifts slowly from their own starting point.
+    bmi = rng.normal(26, 4, users)[user_ids] + np.cumsum(rng.normal(0, 0.05, rows)) / np.sqrt(users)
+    height = rng.uniform(150, 200, rows)
+    weight = bmi * (height / 100) ** 2
+    names = np.char.add("user", np.char.zfill(user_ids.astype(str), 5))
+    labels = np.array(CATEGORIES)[categories(bmi)]
+    with tempfile.TemporaryDirectory() as directory:
+        repo = BMIRepository(os.path.join(directory, "analytics_bench.db"))
+        try:
+            start = time.perf_counter()
+            with repo.conn:
+                repo.conn.executemany(INSERT_ENTRY, zip(names.tolist(), times.tolist(), weight.tolist(),
+                                                        height.tolist(), bmi.tolist(), labels.tolist()))
+            repo.rebuild_stats()
+            print(f"{rows} synthetic rows written in {time.perf_counter() - start:.1f} s")
+            report(repo)
+        finally:
+            repo.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--bench"]:
+        _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 2000000)
+    else:
+        repo = BMIRepository(sys.argv[1] if len(sys.argv) > 1 else "bmi_data.db")
+        try:
+            report(repo)
+        finally:
+            repo.close()
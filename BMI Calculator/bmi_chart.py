@@ -0,0 +1,89 @@
+"""
+Trend window for the BMI Calculator. Created on first use and then hidden
+and reused, so matplotlib is only imported when someone opens it.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+from matplotlib.dates import date2num
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+import bmi_analytics
+
+BAND_COLORS = ("#6A99D5", "#6DBC70", "#FFD700", "#E06666")
+BAND_LIMITS = (10.0, 18.5, 25.0, 30.0, 45.0)
+
+
+class TrendPanel(tk.Toplevel):
+    def __init__(self, parent, repo):
+        tk.Toplevel.__init__(self, parent)
+        self.title("BMI Trends")
+        self.geometry("720x640")
+        self.repo = repo
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.figure = Figure(figsize=(7, 5), dpi=100, layout="constrained")
+        self.history_ax = self.figure.add_subplot(2, 1, 1)
+        self.population_ax = self.figure.add_subplot(2, 1, 2)
+        for low, high, color in zip(BAND_LIMITS, BAND_LIMITS[1:], BAND_COLORS):
+            self.history_ax.axhspan(low, high, color=color, alpha=0.15, linewidth=0)
+        (self.points,) = self.history_ax.plot([], [], "o", color="#4D73FF", markersize=3, label="Entries")
+        (self.rolling_line,) = self.history_ax.plot([], [], color="#1f2a60", label="Rolling avg (7)")
+        (self.weekly_line,) = self.history_ax.plot([], [], drawstyle="steps-post", color="#E06666",
+                                                   alpha=0.8, label="Weekly mean")
+        self.history_ax.set_ylabel("BMI")
+        self.history_ax.xaxis_date()
+        self.history_ax.legend(loc="upper left", fontsize=8)
+        self.population_ax.set_xlabel("Latest BMI of all users")
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.summary = ttk.Label(self, font=("Consolas", 9), justify="left")
+        self.summary.pack(fill="x", padx=10, pady=(0, 8))
+
+    def show(self, username):
+        self.deiconify()
+        self.lift()
+        self.update_user(username)
+
+    def update_user(self, username):
+        history = bmi_analytics.load_user(self.repo, username)
+        latest = bmi_analytics.latest_bmis(self.repo)
+        if not len(history):
+            self.history_ax.set_title(f"{username}: no entries")
+            for line in (self.points, self.rolling_line, self.weekly_line):
+                line.set_data([], [])
+            self.summary.config(text="")
+            self.canvas.draw_idle()
+            return
+        times = date2num(history.times)
+        self.points.set_data(times, history.bmi)
+        self.rolling_line.set_data(times, bmi_analytics.rolling_mean(history))
+        week_start, week_mean, _ = bmi_analytics.weekly_trend(history)
+        self.weekly_line.set_data(date2num(week_start), week_mean)
+        self.history_ax.relim()
+        self.history_ax.autoscale_view()
+        low, high = history.bmi.min(), history.bmi.max()
+        self.history_ax.set_ylim(min(low - 1, 17), max(high + 1, 31))
+        slope = bmi_analytics.trend_slopes(history)[0]
+        trend = "not enough data" if np.isnan(slope) else f"{slope:+.3f} BMI/week"
+        self.history_ax.set_title(f"{username}: {len(history)} entries, trend {trend}")
+        self._draw_population(latest, history.bmi[-1])
+        rank = bmi_analytics.percentile_rank(latest, history.bmi[-1])
+        percentiles = bmi_analytics.population_percentiles(latest)
+        self.summary.config(text=(
+            f"Latest {history.bmi[-1]:.1f} is at or above {rank:.0f}% of {len(latest)} users' latest BMI  |  "
+            + "  ".join(f"p{p} {v:.1f}" for p, v in percentiles.items())
+            + "\nCategory changes between entries (from row to column):\n"
+            + bmi_analytics.format_transitions(bmi_analytics.category_transitions(history))))
+        self.canvas.draw_idle()
+
+    def _draw_population(self, latest, user_latest):
+        ax = self.population_ax
+        ax.cla()
+        ax.set_xlabel("Latest BMI of all users")
+        counts, edges = np.histogram(latest, bins=min(40, max(5, len(latest) // 5)))
+        codes = bmi_analytics.categories((edges[:-1] + edges[1:]) / 2)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge",
+               color=np.array(BAND_COLORS)[codes], edgecolor="white", linewidth=0.5)
+        ax.axvline(user_latest, color="#1f2a60", linewidth=2)
@@ -0,0 +1,289 @@
+"""
+Data access for the BMI Calculator. One connection is opened per process
+and kept for the app's lifetime, in WAL mode, with the schema brought up
+to date by numbered migrations (tracked in PRAGMA user_version).
+Per-user aggregates live in bmi_user_stats and are kept current by the
+write methods below, so statistics never need to scan a user's history.
+
+    python bmi_store.py 1000000                  (benchmark against that many synthetic rows)
+    python bmi_store.py --repair [bmi_data.db]   (rebuild bmi_user_stats from bmi_entries)
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Each entry upgrades the schema by one version; never edit a released step,
+# append a new one instead.
+MIGRATIONS = [
+    """CREATE TABLE IF NOT EXISTS bmi_entries (id INTEGER PRIMARY KEY AUTOINCREMENT,username TEXT,recorded_at TEXT,weight_kg REAL,height_cm REAL,bmi REAL,category TEXT);""",
+    """CREATE INDEX IF NOT EXISTS idx_bmi_entries_user_time ON bmi_entries (username, recorded_at);""",
+    """CREATE TABLE IF NOT EXISTS bmi_user_stats (username TEXT PRIMARY KEY,entry_count INTEGER,first_at TEXT,first_bmi REAL,latest_at TEXT,latest_bmi REAL,min_bmi REAL,max_bmi REAL,mean_bmi REAL,ema_bmi REAL);""",
+    # Covering index: history and analytics reads never have to visit the table.
+    """CREATE INDEX IF NOT EXISTS idx_bmi_entries_user_time_bmi ON bmi_entries (username, recorded_at, bmi);""",
+    """DROP INDEX IF EXISTS idx_bmi_entries_user_time;""",
+]
+# Rebuilt after the migration that creates the table, for existing databases.
+STATS_MIGRATION = 3
+EMA_ALPHA = 0.3
+
+INSERT_ENTRY = "INSERT INTO bmi_entries (username, recorded_at, weight_kg, height_cm, bmi, category) VALUES (?, ?, ?, ?, ?, ?)"
+# Same columns; does nothing if the user already has an entry at that time (uses the covering index).
+INSERT_NEW_ENTRY = "INSERT INTO bmi_entries (username, recorded_at, weight_kg, height_cm, bmi, category) SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM bmi_entries WHERE username = ? AND recorded_at = ?)"
+SELECT_USERS = "SELECT username FROM bmi_user_stats ORDER BY username"
+SELECT_STATS = "SELECT username, entry_count, first_at, first_bmi, latest_at, latest_bmi, min_bmi, max_bmi, mean_bmi, ema_bmi FROM bmi_user_stats WHERE username = ?"
+UPSERT_STATS = "INSERT OR REPLACE INTO bmi_user_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+SELECT_USER_BMIS = "SELECT recorded_at, bmi FROM bmi_entries WHERE username = ? ORDER BY recorded_at"
+SELECT_ALL_BMIS = "SELECT username, recorded_at, bmi FROM bmi_entries ORDER BY username, recorded_at"
+SELECT_HISTORY = "SELECT id, username, recorded_at, weight_kg, height_cm, bmi, category FROM bmi_entries WHERE username = ? ORDER BY recorded_at ASC"
+DELETE_USER = "DELETE FROM bmi_entries WHERE username = ?"
+DELETE_USER_STATS = "DELETE FROM bmi_user_stats WHERE username = ?"
+EXPORT_COLUMNS = "id, username, recorded_at, weight_kg, height_cm, bmi, category"
+
+
+def get_bmi_data(bmi):
+    if bmi < 18.5:
+        return "Underweight", "#6A99D5"  
+    elif bmi < 25:
+        return "Normal", "#6DBC70"     
+    elif bmi < 30:
+        return "Overweight", "#FFD700"  
+    else:
+        return "Obese", "#E06666"       
+
+
+class UserStats:
+    __slots__ = ("username", "count", "first_at", "first_bmi", "latest_at", "latest_bmi",
+                 "min_bmi", "max_bmi", "mean_bmi", "ema_bmi")
+
+    def __init__(self, username, count, first_at, first_bmi, latest_at, latest_bmi, min_bmi, max_bmi, mean_bmi, ema_bmi):
+        self.username = username
+        self.count = count
+        self.first_at = first_at
+        self.first_bmi = first_bmi
+        self.latest_at = latest_at
+        self.latest_bmi = latest_bmi
+        self.min_bmi = min_bmi
+        self.max_bmi = max_bmi
+        self.mean_bmi = mean_bmi
+        self.ema_bmi = ema_bmi
+
+    @classmethod
+    def first(cls, username, recorded_at, bmi):
+        return cls(username, 1, recorded_at, bmi, recorded_at, bmi, bmi, bmi, bmi, bmi)
+
+    def add(self, recorded_at, bmi):
+        """Folds in an entry recorded at or after latest_at."""
+        self.count += 1
+        self.latest_at = recorded_at
+        self.latest_bmi = bmi
+        self.min_bmi = min(self.min_bmi, bmi)
+        self.max_bmi = max(self.max_bmi, bmi)
+        self.mean_bmi += (bmi - self.mean_bmi) / self.count
+        self.ema_bmi = EMA_ALPHA * bmi + (1 - EMA_ALPHA) * self.ema_bmi
+
+    def row(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+def fold_stats(username, entries):
+    """Builds UserStats from (recorded_at, bmi) pairs in time order; None if empty."""
+    stats = None
+    for recorded_at, bmi in entries:
+        if stats is None:
+            stats = UserStats.first(username, recorded_at, bmi)
+        else:
+            stats.add(recorded_at, bmi)
+    return stats
+
+
+class BMIRepository:
+    def __init__(self, path):
+        self.path = path
+        # sqlite3 keeps compiled statements per connection; the queries above
+        # are fixed strings, so each is prepared once and reused.
+        self.conn = sqlite3.connect(path, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.migrate()
+
+    @property
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        version = self.schema_version
+        for number, statement in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self.conn:
+                self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version = {number}")
+            if number == STATS_MIGRATION:
+                self.rebuild_stats()
+
+    def close(self):
+        self.conn.close()
+
+    def add_entry(self, username, recorded_at, weight_kg, height_cm, bmi, category):
+        with self.conn:
+            self.conn.execute(INSERT_ENTRY, (username, recorded_at, weight_kg, height_cm, bmi, category))
+            self._merge_stats(username, [(recorded_at, bmi)])
+
+    def _merge_stats(self, username, entries):
+        """Updates the stats of username for just-inserted (recorded_at, bmi) entries."""
+        entries = sorted(entries)
+        stats = self.user_stats(username)
+        if stats is None:
+            stats = fold_stats(username, entries)
+        elif entries[0][0] >= stats.latest_at:
+            for recorded_at, bmi in entries:
+                stats.add(recorded_at, bmi)
+        else:
+            # A back-dated entry changes the EMA of everything after it.
+            stats = fold_stats(username, self.conn.execute(SELECT_USER_BMIS, (username,)))
+        self.conn.execute(UPSERT_STATS, stats.row())
+
+    def add_entries(self, rows, skip_existing=False):
+        """
+        Inserts many (username, recorded_at, weight_kg, height_cm, bmi, category)
+        rows in one transaction and updates the stats of the users involved.
+        With skip_existing, rows whose user already has an entry at the same
+        recorded_at are left out. Returns the number of rows inserted.
+        """
+        if skip_existing:
+            inserted = []
+            with self.conn:
+                for row in rows:
+                    if self.conn.execute(INSERT_NEW_ENTRY, (*row, row[0], row[1])).rowcount:
+                        inserted.append(row)
+                self._merge_all(inserted)
+            return len(inserted)
+        with self.conn:
+            self.conn.executemany(INSERT_ENTRY, rows)
+            self._merge_all(rows)
+        return len(rows)
+
+    def _merge_all(self, rows):
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row[0], []).append((row[1], row[4]))
+        for username, entries in by_user.items():
+            self._merge_stats(username, entries)
+
+    def list_users(self):
+        return [row[0] for row in self.conn.execute(SELECT_USERS)]
+
+    def user_stats(self, username):
+        """Returns the UserStats for username (one row lookup), or None if it has no entries."""
+        row = self.conn.execute(SELECT_STATS, (username,)).fetchone()
+        return UserStats(*row) if row else None
+
+    def rebuild_stats(self):
+        """Recomputes bmi_user_stats from bmi_entries. Returns the number of users."""
+        with self.conn:
+            self.conn.execute("DELETE FROM bmi_user_stats")
+            rows = self.conn.execute(SELECT_ALL_BMIS)
+            count = 0
+            username, entries = None, []
+            for user, recorded_at, bmi in rows:
+                if user != username:
+                    if entries:
+                        self.conn.execute(UPSERT_STATS, fold_stats(username, entries).row())
+                        count += 1
+                    username, entries = user, []
+                entries.append((recorded_at, bmi))
+            if entries:
+                self.conn.execute(UPSERT_STATS, fold_stats(username, entries).row())
+                count += 1
+        return count
+
+    def history(self, username):
+        return self.conn.execute(SELECT_HISTORY, (username,)).fetchall()
+
+    def iter_entries(self, usernames=None, chunk_size=5000):
+        """
+        Yields entry rows (EXPORT_COLUMNS order) for the given users, or for
+        everyone, ordered by user and time, fetching chunk_size rows at a time.
+        """
+        if usernames is None:
+            cursor = self.conn.execute(f"SELECT {EXPORT_COLUMNS} FROM bmi_entries ORDER BY username, recorded_at")
+        else:
+            usernames = list(usernames)
+            marks = ", ".join("?" * len(usernames))
+            cursor = self.conn.execute(f"SELECT {EXPORT_COLUMNS} FROM bmi_entries WHERE username IN ({marks}) "
+                                       "ORDER BY username, recorded_at", usernames)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def delete_user(self, username):
+        with self.conn:
+            self.conn.execute(DELETE_USER, (username,))
+            self.conn.execute(DELETE_USER_STATS, (username,))
+
+
+def _bench(rows, users=1000):
+    with tempfile.TemporaryDirectory() as directory:
+        repo = BMIRepository(os.path.join(directory, "bmi_bench.db"))
+        try:
+            _run_bench(repo, rows, users)
+        finally:
+            repo.close()
+
+
+def _run_bench(repo, rows, users):
+    import random
+    from datetime import datetime, timedelta
+    rng = random.Random(1)
+    start_day = datetime(2020, 1, 1)
+    start = time.perf_counter()
+
+    def generate():
+        for i in range(rows):
+            weight = rng.uniform(45, 120)
+            height = rng.uniform(150, 200)
+            bmi = weight / (height / 100) ** 2
+            yield (f"user{i % users:04d}", (start_day + timedelta(minutes=i)).isoformat(), weight, height, bmi,
+                   "Underweight" if bmi < 18.5 else "Normal" if bmi < 25 else "Overweight" if bmi < 30 else "Obese")
+    with repo.conn:
+        repo.conn.executemany(INSERT_ENTRY, generate())
+    print(f"{rows} rows loaded in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    repo.rebuild_stats()
+    print(f"stats rebuilt in {time.perf_counter() - start:.1f} s")
+
+    def timed(label, func, repeat=20):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        print(f"  {label:<24} {(time.perf_counter() - start) * 1000 / repeat:8.2f} ms")
+        return result
+
+    listed = timed("list users", repo.list_users)
+    timed("user stats", lambda: repo.user_stats("user0500"))
+    timed("history (one user)", lambda: repo.history("user0500"))
+    timed("add entry", lambda: repo.add_entry("user0500", datetime.now().isoformat(), 70.0, 175.0, 22.9, "Normal"))
+    plan = repo.conn.execute("EXPLAIN QUERY PLAN " + SELECT_HISTORY, ("user0500",)).fetchall()
+    print(f"{len(listed)} users; history plan: {plan[-1][-1]}")
+
+
+def repair(path):
+    repo = BMIRepository(path)
+    try:
+        start = time.perf_counter()
+        users = repo.rebuild_stats()
+        print(f"Rebuilt statistics for {users} users in {(time.perf_counter() - start) * 1000:.0f} ms")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--repair"]:
+        repair(sys.argv[2] if len(sys.argv) > 2 else "bmi_data.db")
+    else:
+        _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,180 @@
+"""
+Bulk CSV import and export for BMI history. Imports are read row by row and
+written in batched transactions; exports stream from the database in chunks,
+so memory use stays flat however large the file or history is.
+
+    python bmi_transfer.py import old_tracker.csv
+    python bmi_transfer.py export all.csv
+    python bmi_transfer.py export some.csv --user alice --user bob
+"""
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime
+
+from bmi_store import BMIRepository, get_bmi_data
+
+EXPORT_HEADER = ["ID", "Username", "Recorded At", "Weight (kg)", "Height (cm)", "BMI", "Category"]
+# Accepted spellings of the columns an import needs; our own export header works as is.
+IMPORT_COLUMNS = {
+    "username": ("username", "user", "name"),
+    "recorded_at": ("recorded at", "recorded_at", "date", "datetime", "timestamp"),
+    "weight_kg": ("weight (kg)", "weight_kg", "weight"),
+    "height_cm": ("height (cm)", "height_cm", "height"),
+}
+WEIGHT_RANGE = (1.0, 500.0)
+HEIGHT_RANGE = (30.0, 300.0)
+
+
+class ImportResult:
+    __slots__ = ("imported", "duplicates", "rejected", "errors", "seconds")
+
+    def __init__(self):
+        self.imported = 0
+        # Rows already in the database (same user and time), e.g. from re-importing an export.
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.seconds if self.seconds else 0.0
+
+
+def map_columns(header):
+    """Returns {field: column index} for the import columns found in header."""
+    normalized = [h.strip().lower() for h in header]
+    mapping = {}
+    for field, names in IMPORT_COLUMNS.items():
+        for name in names:
+            if name in normalized:
+                mapping[field] = normalized.index(name)
+                break
+    missing = [f for f in ("username", "weight_kg", "height_cm") if f not in mapping]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    return mapping
+
+
+def parse_row(row, mapping, now):
+    """Validates one CSV row and returns an entry tuple; raises ValueError if invalid."""
+    def field(name):
+        index = mapping.get(name)
+        return row[index].strip() if index is not None and index < len(row) else ""
+    username = field("username")
+    if not username:
+        raise ValueError("empty username")
+    try:
+        weight = float(field("weight_kg"))
+        height = float(field("height_cm"))
+    except ValueError:
+        raise ValueError("weight and height must be numbers")
+    if not WEIGHT_RANGE[0] <= weight <= WEIGHT_RANGE[1]:
+        raise ValueError(f"weight {weight} kg out of range")
+    if not HEIGHT_RANGE[0] <= height <= HEIGHT_RANGE[1]:
+        raise ValueError(f"height {height} cm out of range")
+    recorded_at = field("recorded_at")
+    if recorded_at:
+        try:
+            recorded_at = datetime.fromisoformat(recorded_at).isoformat()
+        except ValueError:
+            raise ValueError(f"bad date {recorded_at!r} (expected ISO format)")
+    else:
+        recorded_at = now
+    bmi = weight / ((height / 100) ** 2)
+    return username, recorded_at, weight, height, bmi, get_bmi_data(bmi)[0]
+
+
+def _write_batch(repo, batch, now, result):
+    # Rows without a date all get the import time, so only dated rows can be duplicates.
+    dated = [row for row in batch if row[1] is not now]
+    undated = [row for row in batch if row[1] is now]
+    inserted = repo.add_entries(dated, skip_existing=True)
+    if undated:
+        inserted += repo.add_entries(undated)
+    result.imported += inserted
+    result.duplicates += len(batch) - inserted
+
+
+def import_csv(repo, path, batch_size=5000, max_errors=20):
+    """
+    Streams path into the database in batches of batch_size rows. Rows that
+    match an existing entry of the same user at the same time are skipped.
+    """
+    result = ImportResult()
+    start = time.perf_counter()
+    now = datetime.now().isoformat()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return result
+        mapping = map_columns(header)
+        batch = []
+        for line_number, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                batch.append(parse_row(row, mapping, now))
+            except ValueError as e:
+                result.rejected += 1
+                if len(result.errors) < max_errors:
+                    result.errors.append(f"line {line_number}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                _write_batch(repo, batch, now, result)
+                batch = []
+        if batch:
+            _write_batch(repo, batch, now, result)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def export_csv(repo, path, usernames=None, chunk_size=5000):
+    """Writes the history of usernames (or everyone) to path. Returns the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_HEADER)
+        for row in repo.iter_entries(usernames, chunk_size):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export BMI history as CSV.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="CSV file to read (import) or write (export)")
+    parser.add_argument("--db", default="bmi_data.db", help="Database file (default: bmi_data.db)")
+    parser.add_argument("--user", action="append", help="Export only this user (repeatable)")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per transaction / fetch")
+    args = parser.parse_args(argv)
+    repo = BMIRepository(args.db)
+    try:
+        if args.command == "import":
+            try:
+                result = import_csv(repo, args.path, args.batch)
+            except (OSError, ValueError) as e:
+                print(f"Import failed: {e}", file=sys.stderr)
+                return 1
+            for error in result.errors:
+                print(error, file=sys.stderr)
+            print(f"{result.imported} rows imported, {result.duplicates} already present, "
+                  f"{result.rejected} rejected in {result.seconds:.2f}s "
+                  f"({result.rows_per_second:.0f} rows/s)", file=sys.stderr)
+            return 0 if result.imported or result.duplicates or not result.rejected else 1
+        start = time.perf_counter()
+        count = export_csv(repo, args.path, args.user, args.batch)
+        elapsed = time.perf_counter() - start
+        print(f"{count} rows exported in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} rows/s)",
+              file=sys.stderr)
+        return 0
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,20 @@
-from dotenv import load_dotenv
+import importlib.util
 import os
-import requests
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-from io import BytesIO
-from datetime import datetime
 import threading
+from scheduler import FetchScheduler
+from icons import IconStore, normalize_icon_url
+from weather_core import (detect_location_by_ip, get_api_key, get_response_cache, load_snapshot, location_key,
+                          refresh_snapshot)
+from refresher import AutoRefresher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.gradient import GradientBackground
 
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    MATPLOTLIB_AVAILABLE = True
-except:
-    MATPLOTLIB_AVAILABLE = False
-
-load_dotenv()
-API_KEY = os.getenv("WEATHERAPI_KEY")
-if not API_KEY:
-    raise ValueError("API key not found")
-
-def fetch_json(url, params=None, timeout=10):
-    r = requests.get(url, params=params, timeout=timeout)
-    r.raise_for_status()
-    return r.json()
-
-def detect_location_by_ip():
-    data = fetch_json("https://ipinfo.io/json")
-    city = data.get("city")
-    region = data.get("region")
-    country = data.get("country")
-    if city:
-        return f"{city},{region},{country}"
-    loc = data.get("loc")
-    if loc:
-        return loc
-    raise RuntimeError("IP location failed")
-
-def build_weatherapi_url(endpoint="forecast.json"):
-    return f"https://api.weatherapi.com/v1/{endpoint}"
+# matplotlib is only imported on the first chart draw
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
+HISTORY_SIZE = 20
 
 class WeatherApp(tk.Tk):
     def __init__(self):
@@ -50,19 +26,28 @@ class WeatherApp(tk.Tk):
         self.create_theme()
         self.unit = tk.StringVar(value="C")
         self._icon_image = None
-        self._hourly_chart_canvas = None
+        self.chart = None
+        self.snapshot = None
+        self.history = []
+        self.history_index = -1
+        self.cities_window = None
+        self.scheduler = FetchScheduler(self, on_stats=self.show_queue_stats)
+        self.icons = IconStore(self.scheduler.post)
+        self.auto_refresh = tk.BooleanVar(value=False)
+        self.refresher = AutoRefresher(self, refresh_snapshot, self.scheduler.post,
+                                       self.on_auto_update, self.on_auto_error)
+        # WEATHER_WATCH locations are always polled; otherwise only the one on screen is.
+        self.pinned = {q.strip() for q in os.getenv("WEATHER_WATCH", "").split(",") if q.strip()}
+        for q in self.pinned:
+            self.refresher.watch(q)
+        self.current_query = None
         self.create_widgets()
 
     def create_gradient(self):
         self.bg_canvas = tk.Canvas(self, width=760, height=520, highlightthickness=0)
         self.bg_canvas.place(x=0, y=0)
-
-        for i in range(520):
-            r = int(20 + (i / 520) * 20)
-            g = int(20 + (i / 520) * 40)
-            b = int(40 + (i / 520) * 80)
-            color = f"#{r:02x}{g:02x}{b:02x}"
-            self.bg_canvas.create_line(0, i, 760, i, fill=color)
+        self.bg_gradient = GradientBackground(self.bg_canvas, "#141428", "#283c78")
+        self.bg_gradient.redraw(760, 520)
 
     def create_theme(self):
         style = ttk.Style()
@@ -107,13 +92,17 @@ class WeatherApp(tk.Tk):
         top_frame = ttk.Frame(self, padding=10)
         top_frame.place(x=0, y=0, relwidth=1)
         ttk.Label(top_frame, text="Location:").pack(side="left")
-        self.location_entry = ttk.Entry(top_frame, width=30)
+        self.location_entry = ttk.Entry(top_frame, width=22)
         self.location_entry.pack(side="left", padx=(6, 4))
         self.location_entry.insert(0, "Mumbai")
         ttk.Button(top_frame, text="Get Weather", command=self.on_get_weather).pack(side="left", padx=4)
         ttk.Button(top_frame, text="Use my location", command=self.on_use_my_location).pack(side="left", padx=4)
+        ttk.Button(top_frame, text="Cities", command=self.on_open_cities).pack(side="left", padx=4)
+        ttk.Button(top_frame, text="◀", width=2, command=lambda: self.on_history(-1)).pack(side="left")
+        ttk.Button(top_frame, text="▶", width=2, command=lambda: self.on_history(1)).pack(side="left")
         unit_frame = ttk.Frame(top_frame)
         unit_frame.pack(side="right")
+        ttk.Checkbutton(unit_frame, text="Auto", variable=self.auto_refresh, command=self.on_toggle_auto).pack(side="left", padx=(0, 6))
         ttk.Radiobutton(unit_frame, text="°C", variable=self.unit, value="C", command=self.on_unit_change).pack(side="left")
         ttk.Radiobutton(unit_frame, text="°F", variable=self.unit, value="F", command=self.on_unit_change).pack(side="left")
         body = ttk.Frame(self, padding=10)
@@ -171,125 +160,213 @@ class WeatherApp(tk.Tk):
             self.chart_container = chart_frame
         self.status_lbl = ttk.Label(self, text="Ready", relief="sunken", anchor="w")
         self.status_lbl.place(x=0, y=498, relwidth=1)
+        self.queue_lbl = ttk.Label(self, text="", anchor="e")
+        self.queue_lbl.place(relx=1.0, x=-4, y=499, anchor="ne")
 
     def on_get_weather(self):
         location = self.location_entry.get().strip()
         if not location:
             return
-        threading.Thread(target=self.fetch_and_display, args=(location,), daemon=True).start()
+        self.status("Fetching...")
+        self.scheduler.submit(
+            location_key(location),
+            lambda: self.load_snapshot(location),
+            self.on_snapshot_loaded,
+            self.on_fetch_error,
+        )
 
     def on_use_my_location(self):
         self.status("Detecting location...")
         def run():
-            try:
-                q = detect_location_by_ip()
-                self.location_entry.delete(0, tk.END)
-                self.location_entry.insert(0, q)
-                self.fetch_and_display(q)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-                self.status("Ready")
-        threading.Thread(target=run, daemon=True).start()
+            q = detect_location_by_ip()
+            return q, self.load_snapshot(q)
+        def done(result):
+            q, snapshot = result
+            self.location_entry.delete(0, tk.END)
+            self.location_entry.insert(0, q)
+            self.on_snapshot_loaded(snapshot)
+        self.scheduler.submit("ip-location", run, done, self.on_fetch_error, debounce=False)
+
+    def on_open_cities(self):
+        if self.cities_window is None or not self.cities_window.winfo_exists():
+            self.cities_window = CityGridWindow(self)
+        self.cities_window.lift()
 
     def on_unit_change(self):
-        loc = self.location_entry.get().strip()
-        if loc:
-            threading.Thread(target=self.fetch_and_display, args=(loc,), daemon=True).start()
+        if self.snapshot is not None:
+            self.render()
+
+    def on_history(self, step):
+        index = self.history_index + step
+        if 0 <= index < len(self.history):
+            self.history_index = index
+            self.snapshot = self.history[index]
+            self.render()
+
+    def show_snapshot(self, snapshot):
+        if self.history and self.history[self.history_index].title == snapshot.title:
+            self.history[self.history_index] = snapshot
+        else:
+            del self.history[self.history_index + 1:]
+            self.history.append(snapshot)
+            del self.history[:-HISTORY_SIZE]
+            self.history_index = len(self.history) - 1
+        self.snapshot = snapshot
+        self.render()
 
     def status(self, text):
         self.status_lbl.config(text=text)
 
-    def fetch_and_display(self, location_query):
-        self.status("Fetching...")
-        try:
-            params = {"key": API_KEY, "q": location_query, "days": 3, "aqi": "no", "alerts": "no"}
-            data = fetch_json(build_weatherapi_url(), params=params)
-            self.after(0, lambda: self.update_ui(data))
-            self.status("Ready")
-        except Exception as e:
-            self.status("Error")
-            messagebox.showerror("Error", str(e))
+    def show_queue_stats(self, depth, dropped):
+        self.queue_lbl.config(text=f"queue {depth} | dropped {dropped}")
 
-    def update_ui(self, data):
-        location = data["location"]
-        current = data["current"]
-        forecast = data["forecast"]
-        self.city_lbl.config(text=f"{location['name']}, {location['country']}")
-        self.updated_lbl.config(text=f"Last updated: {current['last_updated']}")
-        if self.unit.get() == "C":
-            temp = current["temp_c"]
-            feels = current["feelslike_c"]
-            max_key = "maxtemp_c"
-            min_key = "mintemp_c"
+    def load_snapshot(self, location_query):
+        """Runs on a scheduler worker; returns a parsed WeatherSnapshot."""
+        return load_snapshot(location_query, on_refresh=lambda fresh: self.scheduler.post(self.on_refreshed, fresh))
+
+    def on_toggle_auto(self):
+        if self.auto_refresh.get():
+            if self.current_query:
+                self.refresher.watch(self.current_query, self.snapshot)
+            self.refresher.start()
+            self.status(f"Auto-refresh on ({len(self.refresher.watched)} watched)")
         else:
-            temp = current["temp_f"]
-            feels = current["feelslike_f"]
-            max_key = "maxtemp_f"
-            min_key = "mintemp_f"
-        self.temp_lbl.config(text=f"{temp:.1f}°{self.unit.get()}")
-        self.cond_lbl.config(text=current["condition"]["text"])
-        self.feels_lbl.config(text=f"Feels like: {feels:.1f}°{self.unit.get()}")
-        self.wind_lbl.config(text=f"Wind: {current['wind_kph']} kph / {current['wind_mph']} mph")
-        self.humidity_lbl.config(text=f"Humidity: {current['humidity']}%")
-        icon_url = "https:" + current["condition"]["icon"]
-        r = requests.get(icon_url)
-        img = Image.open(BytesIO(r.content)).resize((64,64))
-        self._icon_image = ImageTk.PhotoImage(img)
-        self.icon_label.config(image=self._icon_image)
-        today = forecast["forecastday"][0]["date"]
-        hourly = next(fd["hour"] for fd in forecast["forecastday"] if fd["date"] == today)
+            self.refresher.stop()
+            self.status("Auto-refresh off")
+
+    def on_auto_update(self, query, snapshot):
+        if self.snapshot is not None and self.snapshot.title == snapshot.title:
+            self.show_snapshot(snapshot)
+            self.status(f"Auto-refreshed {snapshot.current.last_updated} ({self.refresher.skipped} unchanged polls skipped)")
+
+    def on_auto_error(self, query, error):
+        self.status(f"Auto-refresh failed for {query}: {error}")
+
+    def on_snapshot_loaded(self, snapshot):
+        self.show_snapshot(snapshot)
+        query = self.location_entry.get().strip()
+        if self.current_query not in (None, query) and self.current_query not in self.pinned:
+            self.refresher.unwatch(self.current_query)
+        self.current_query = query
+        if self.auto_refresh.get():
+            self.refresher.watch(query, snapshot)
+        stats = get_response_cache().stats()
+        self.status(f"Ready (cache {stats['hits'] + stats['stale_hits']} hits / {stats['misses']} misses)")
+
+    def on_refreshed(self, snapshot):
+        if self.snapshot is not None and self.snapshot.title == snapshot.title:
+            self.show_snapshot(snapshot)
+
+    def on_fetch_error(self, error):
+        self.status("Error")
+        messagebox.showerror("Error", str(error))
+
+    def set_icon(self, icon_url, photo):
+        if self.snapshot is None or normalize_icon_url(self.snapshot.current.icon) != icon_url:
+            return
+        self._icon_image = photo
+        self.icon_label.config(image=photo)
+
+    def render(self):
+        self.update_ui(self.snapshot)
+
+    def update_ui(self, snapshot):
+        current = snapshot.current
+        unit = self.unit.get()
+        self.city_lbl.config(text=snapshot.title)
+        self.updated_lbl.config(text=f"Last updated: {current.last_updated}")
+        self.temp_lbl.config(text=f"{current.temp(unit):.1f}°{unit}")
+        self.cond_lbl.config(text=current.condition)
+        self.feels_lbl.config(text=f"Feels like: {current.feels(unit):.1f}°{unit}")
+        self.wind_lbl.config(text=f"Wind: {current.wind_kph} kph / {current.wind_mph} mph")
+        self.humidity_lbl.config(text=f"Humidity: {current.humidity}%")
+        icon_url = normalize_icon_url(current.icon)
+        self.icons.request(icon_url, lambda photo: self.set_icon(icon_url, photo))
+        self.icons.prefetch(day.icon for day in snapshot.days)
+        hourly = snapshot.hourly
+        temps = hourly.temps(unit)
         self.hourly_list.delete(0, tk.END)
-        times = []
-        temps = []
-        for h in hourly:
-            tstr = h["time"].split(" ")[1]
-            if self.unit.get() == "C":
-                t = h["temp_c"]
-            else:
-                t = h["temp_f"]
-            self.hourly_list.insert(tk.END, f"{tstr} — {t:.1f}°{self.unit.get()} — {h['condition']['text']}")
-            times.append(tstr)
-            temps.append(t)
+        self.hourly_list.insert(tk.END, *(
+            f"{tstr} — {t:.1f}°{unit} — {cond}"
+            for tstr, t, cond in zip(hourly.times, temps, hourly.conditions)
+        ))
         for i in self.forecast_tree.get_children():
             self.forecast_tree.delete(i)
-        for fd in forecast["forecastday"][:3]:
-            d = fd["date"]
-            day = fd["day"]
-            ma = day[max_key]
-            mi = day[min_key]
-            cond = day["condition"]["text"]
+        for day in snapshot.days:
             self.forecast_tree.insert("", tk.END, values=(
-                d,
-                f"{ma:.1f}°{self.unit.get()}",
-                f"{mi:.1f}°{self.unit.get()}",
-                cond,
+                day.date,
+                f"{day.max_temp(unit):.1f}°{unit}",
+                f"{day.min_temp(unit):.1f}°{unit}",
+                day.condition,
             ))
         if MATPLOTLIB_AVAILABLE:
-            self.draw_chart(times, temps)
-    def draw_chart(self, times, temps):
-        if hasattr(self, "_chart_widget") and self._chart_widget:
-            self._chart_widget.get_tk_widget().destroy()
-            self._chart_widget = None
-        fig, ax = plt.subplots(figsize=(6,2.5), dpi=100)
-        ax.plot(range(len(temps)), temps, marker="o")
-        ax.set_xticks(range(len(times)))
-        labels = [t if i % max(1, len(times)//8) == 0 else "" for i, t in enumerate(times)]
-        ax.set_xticklabels(labels, rotation=45, ha="right")
-        ax.set_ylabel(f"Temp (°{self.unit.get()})")
-        ax.set_title("Hourly Temperature")
-        fig.patch.set_facecolor("#10131a")
-        ax.set_facecolor("#151821")
-        ax.tick_params(axis="x", colors="white")
-        ax.tick_params(axis="y", colors="white")
-        ax.title.set_color("white")
-        ax.yaxis.label.set_color("white")
-        fig.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_container)
-        canvas.draw()
-        self._chart_widget = canvas
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+            self.draw_chart(hourly, unit)
+    def draw_chart(self, hourly, unit):
+        if self.chart is None:
+            from chart import HourlyChart
+            self.chart = HourlyChart(self.chart_container)
+        ms = self.chart.update(
+            hourly.times,
+            hourly.temps(unit),
+            unit,
+            feels=hourly.feels(unit),
+            precip=hourly.precip_mm,
+        )
+        self.chart_container.config(text=f"Hourly Temperature Chart ({ms:.0f} ms)")
+
+class CityGridWindow(tk.Toplevel):
+    """Multi-city view; rows fill in as each batch result arrives."""
+
+    COLUMNS = (("query", "Query", 110), ("name", "City", 110), ("temp", "Temp", 70),
+               ("condition", "Condition", 150), ("humidity", "Humidity", 70), ("elapsed_ms", "ms", 60))
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Multi-city Weather")
+        self.geometry("620x360")
+        self.configure(bg="#10131a")
+        top = ttk.Frame(self, padding=8)
+        top.pack(fill="x")
+        ttk.Label(top, text="Cities:").pack(side="left")
+        self.cities_entry = ttk.Entry(top, width=50)
+        self.cities_entry.pack(side="left", padx=6, fill="x", expand=True)
+        self.cities_entry.insert(0, os.getenv("WEATHER_CITIES", "Mumbai, Delhi, London, New York, Tokyo"))
+        ttk.Button(top, text="Fetch all", command=self.on_fetch_all).pack(side="left")
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key in ("query", "name", "condition") else "center")
+        self.tree.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        self.batch_id = 0
+
+    def on_fetch_all(self):
+        from batch import iter_batch
+        locations = list(dict.fromkeys(c.strip() for c in self.cities_entry.get().split(",") if c.strip()))
+        self.batch_id += 1
+        batch_id = self.batch_id
+        self.tree.delete(*self.tree.get_children())
+        for q in locations:
+            self.tree.insert("", tk.END, iid=q, values=(q, "…", "", "", "", ""))
+        def run():
+            for row in iter_batch(locations):
+                self.app.scheduler.post(self.fill_row, batch_id, row)
+        threading.Thread(target=run, daemon=True).start()
+
+    def fill_row(self, batch_id, row):
+        if batch_id != self.batch_id or not self.winfo_exists() or not self.tree.exists(row["query"]):
+            return
+        unit = self.app.unit.get()
+        if row["error"]:
+            values = (row["query"], "Error", "", row["error"], "", row["elapsed_ms"])
+        else:
+            temp = row["temp_c"] if unit == "C" else row["temp_f"]
+            values = (row["query"], row["name"], f"{temp:.1f}°{unit}", row["condition"],
+                      f"{row['humidity']}%", row["elapsed_ms"])
+        self.tree.item(row["query"], values=values)
 
 def main():
+    get_api_key()
     app = WeatherApp()
     app.mainloop()
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""
+Fetches many locations at once and streams the results as they arrive.
+
+    python batch.py Mumbai London "New York" --format csv
+    python batch.py --file sites.txt --concurrency 16 --rate 10
+    python batch.py Paris --base-url http://127.0.0.1:8000/v1   (local stub server, no API key needed)
+"""
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from weather_core import build_weatherapi_url, fetch_json, forecast_params
+from common import http_client
+from model import WeatherSnapshot
+
+FIELDS = ["query", "name", "country", "temp_c", "temp_f", "condition", "humidity",
+          "wind_kph", "last_updated", "elapsed_ms", "error"]
+
+
+class RateLimiter:
+    """Token bucket per host; acquire() blocks until a request is allowed."""
+
+    def __init__(self, rate_per_sec, burst=None):
+        self.rate = rate_per_sec
+        self.burst = burst or max(1, int(rate_per_sec))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_row(location_query, limiter=None, base_url=None, days=3):
+    """Fetches one location and flattens it into a result row. Never raises."""
+    url = build_weatherapi_url(base_url=base_url)
+    row = dict.fromkeys(FIELDS, "")
+    row["query"] = location_query
+    start = time.perf_counter()
+    try:
+        if limiter:
+            limiter.acquire(urlsplit(url).netloc)
+        params = forecast_params(location_query, days, require_key=base_url is None)
+        snapshot = WeatherSnapshot.from_json(fetch_json(url, params=params))
+        current = snapshot.current
+        row.update(
+            name=snapshot.name,
+            country=snapshot.country,
+            temp_c=current.temp_c,
+            temp_f=current.temp_f,
+            condition=current.condition,
+            humidity=current.humidity,
+            wind_kph=current.wind_kph,
+            last_updated=current.last_updated,
+        )
+    except Exception as e:
+        row["error"] = str(e)
+    row["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return row
+
+
+def iter_batch(locations, concurrency=8, rate_per_sec=5.0, base_url=None, days=3):
+    """Yields one row per location in completion order."""
+    limiter = RateLimiter(rate_per_sec) if rate_per_sec else None
+    # One connection per worker, so concurrent requests to a host don't open and discard extras.
+    http_client.get_client().ensure_pool_size(max(1, concurrency))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as pool:
+        futures = [pool.submit(fetch_row, q, limiter, base_url, days) for q in locations]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def read_locations(args):
+    locations = list(args.locations)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            locations.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return locations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch weather for many locations concurrently.")
+    parser.add_argument("locations", nargs="*", help="Location queries (city, lat,lon, ...)")
+    parser.add_argument("--file", help="Text file with one location per line")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=5.0, help="Max requests per second per host (0 = unlimited)")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--base-url", help="Override the WeatherAPI base url, e.g. a local stub server "
+                                           "(WEATHERAPI_KEY is then optional)")
+    args = parser.parse_args(argv)
+    locations = read_locations(args)
+    if not locations:
+        parser.error("no locations given")
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=FIELDS)
+        writer.writeheader()
+    start = time.perf_counter()
+    errors = 0
+    for row in iter_batch(locations, args.concurrency, args.rate, args.base_url, args.days):
+        if row["error"]:
+            errors += 1
+        if writer:
+            writer.writerow(row)
+        else:
+            sys.stdout.write(json.dumps(row) + "\n")
+        sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{len(locations)} locations, {errors} errors in {elapsed:.2f}s "
+          f"({len(locations) / elapsed:.1f}/s)", file=sys.stderr)
+    return 1 if errors == len(locations) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
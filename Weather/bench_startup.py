@@ -0,0 +1,61 @@
+"""
+Reports cold import times for the weather modules and the time until the
+main window is first painted.
+
+    python bench_startup.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULES = ["weather_core", "model", "cache", "scheduler", "icons", "app", "chart"]
+
+
+def time_import(module):
+    """Imports module in a fresh interpreter and returns (seconds, error)."""
+    code = (
+        "import time, sys; t = time.perf_counter(); "
+        f"import {module}; "
+        "sys.stdout.write(str(time.perf_counter() - t))"
+    )
+    env = dict(os.environ, WEATHERAPI_KEY=os.environ.get("WEATHERAPI_KEY", "bench"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return float(result.stdout), None
+
+
+def time_first_paint():
+    os.environ.setdefault("WEATHERAPI_KEY", "bench")
+    start = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    window = app.WeatherApp()
+    window.update()
+    painted = time.perf_counter()
+    window.destroy()
+    return imported - start, painted - start
+
+
+def main():
+    sys.path.insert(0, HERE)
+    print("Cold import times:")
+    for module in MODULES:
+        seconds, error = time_import(module)
+        if error:
+            print(f"  {module:<14} failed: {error}")
+        else:
+            print(f"  {module:<14} {seconds * 1000:8.1f} ms")
+    try:
+        import_s, paint_s = time_first_paint()
+    except Exception as e:
+        print(f"First paint skipped: {e}")
+        return
+    print(f"app import:   {import_s * 1000:8.1f} ms")
+    print(f"first paint:  {paint_s * 1000:8.1f} ms (from start of import)")
+
+
+if __name__ == "__main__":
+    main()
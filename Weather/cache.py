@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_cache.db")
+
+
+def make_key(url, params=None):
+    """Builds a cache key from the url and params, ignoring the API key."""
+    items = []
+    for k, v in sorted((params or {}).items()):
+        if k == "key":
+            continue
+        if k == "q":
+            v = " ".join(str(v).lower().replace(" ,", ",").replace(", ", ",").split())
+        items.append(f"{k}={v}")
+    return url + "?" + "&".join(items)
+
+
+class ResponseCache:
+    """
+    LRU cache of JSON responses with a TTL, backed by a small SQLite file.
+    Entries past their TTL are still served while a background refresh runs.
+    Responses are passed through decode() once when stored or loaded, so
+    memory holds the decoded objects and only SQLite keeps the JSON body.
+    """
+
+    def __init__(self, ttl=600, max_size=64, path=CACHE_FILENAME, decode=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.decode = decode or (lambda value: value)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._open_db()
+
+    def _open_db(self):
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, stored_at REAL, body TEXT)")
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, stored_at, body FROM responses ORDER BY stored_at DESC LIMIT ?", (self.max_size,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Cache Error: {e}")
+            self._conn = None
+            return
+        for key, stored_at, body in reversed(rows):
+            try:
+                self._entries[key] = (stored_at, self.decode(json.loads(body)))
+            except (ValueError, KeyError, TypeError, IndexError):
+                continue
+
+    def _persist(self, key, stored_at, value):
+        if self._conn is None:
+            return
+        with self._db_lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, stored_at, body) VALUES (?, ?, ?)",
+                    (key, stored_at, json.dumps(value)),
+                )
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_size,),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Cache Error: {e}")
+
+    def put(self, key, value):
+        """Stores a raw response; returns its decoded form."""
+        stored_at = time.time()
+        decoded = self.decode(value)
+        with self._lock:
+            self._entries[key] = (stored_at, decoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        self._persist(key, stored_at, value)
+        return decoded
+
+    def get(self, key):
+        """Returns (value, is_fresh) or (None, False) when the key is unknown."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+        stored_at, value = entry
+        return value, time.time() - stored_at < self.ttl
+
+    def get_or_fetch(self, key, fetch, on_refresh=None):
+        """
+        Returns a cached (decoded) value or calls fetch() for a new response.
+        Stale values are returned immediately; fetch() then runs on a
+        background thread and on_refresh(value) is called with the result.
+        """
+        value, fresh = self.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            elif fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        if value is None:
+            return self.put(key, fetch())
+        if not fresh:
+            self._refresh_async(key, fetch, on_refresh)
+        return value
+
+    def _refresh_async(self, key, fetch, on_refresh):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                value = self.put(key, fetch())
+                if on_refresh:
+                    on_refresh(value)
+            except Exception as e:
+                print(f"Cache refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "ttl": self.ttl,
+                "max_size": self.max_size,
+            }
@@ -0,0 +1,100 @@
+import math
+import time
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+BG_COLOR = "#10131a"
+AXES_COLOR = "#151821"
+
+
+class HourlyChart:
+    """
+    One persistent figure for the hourly chart. Series are updated in place
+    with set_data; when the axes layout is unchanged only the lines are
+    blitted over a cached background instead of redrawing the whole figure.
+    """
+
+    def __init__(self, master):
+        self.figure = Figure(figsize=(6, 2.5), dpi=100)
+        self.figure.patch.set_facecolor(BG_COLOR)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_facecolor(AXES_COLOR)
+        self.ax.set_title("Hourly Temperature", color="white")
+        self.ax.tick_params(axis="x", colors="white")
+        self.ax.tick_params(axis="y", colors="white")
+        self.ax.yaxis.label.set_color("white")
+        self.precip_ax = self.ax.twinx()
+        self.precip_ax.tick_params(axis="y", colors="#6fa8dc")
+        self.precip_ax.set_ylabel("Precip (mm)", color="#6fa8dc")
+        (self.temp_line,) = self.ax.plot([], [], marker="o", color="#f6b26b", label="Temp", animated=True)
+        (self.feels_line,) = self.ax.plot([], [], linestyle="--", color="#e06666", label="Feels like", animated=True)
+        (self.precip_line,) = self.precip_ax.plot([], [], drawstyle="steps-mid", color="#6fa8dc", label="Precip", animated=True)
+        self.lines = (self.temp_line, self.feels_line, self.precip_line)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self._background = None
+        self._times = None
+        self._unit = None
+        self.last_redraw_ms = 0.0
+        self.full_redraws = 0
+        self.blit_redraws = 0
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for line in self.lines:
+            line.axes.draw_artist(line)
+
+    @staticmethod
+    def _limits(*series):
+        values = [v for s in series if s is not None for v in s]
+        if not values:
+            return (0.0, 1.0)
+        # Snap to multiples of 5 so small data changes keep the same axes and can be blitted.
+        lo = math.floor((min(values) - 1) / 5) * 5
+        hi = math.ceil((max(values) + 1) / 5) * 5
+        return (float(lo), float(hi))
+
+    def update(self, times, temps, unit, feels=None, precip=None):
+        start = time.perf_counter()
+        x = range(len(times))
+        self.temp_line.set_data(x, temps)
+        for line, values in ((self.feels_line, feels), (self.precip_line, precip)):
+            if values is None:
+                line.set_data([], [])
+            else:
+                line.set_data(x, values)
+        ylim = self._limits(temps, feels)
+        precip_lim = (0.0, float(max(1, math.ceil(max(precip) * 1.2)) if precip else 1.0))
+        layout_changed = (
+            self._background is None
+            or list(times) != self._times
+            or unit != self._unit
+            or ylim != self.ax.get_ylim()
+            or precip_lim != self.precip_ax.get_ylim()
+        )
+        if layout_changed:
+            self._times = list(times)
+            self._unit = unit
+            self.ax.set_xlim(-0.5, max(0.5, len(times) - 0.5))
+            self.ax.set_ylim(*ylim)
+            self.precip_ax.set_ylim(*precip_lim)
+            step = max(1, len(times) // 8)
+            self.ax.set_xticks(list(x))
+            self.ax.set_xticklabels([t if i % step == 0 else "" for i, t in enumerate(times)], rotation=45, ha="right")
+            self.ax.set_ylabel(f"Temp (°{unit})")
+            if self.full_redraws == 0:
+                self.figure.tight_layout()
+            self.canvas.draw()
+            self.full_redraws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.figure.bbox)
+            self.blit_redraws += 1
+        self.last_redraw_ms = (time.perf_counter() - start) * 1000
+        return self.last_redraw_ms
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from weather_core import fetch_bytes
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon_cache")
+ICON_SIZE = (64, 64)
+
+
+def normalize_icon_url(icon):
+    return "https:" + icon if icon.startswith("//") else icon
+
+
+class IconStore:
+    """
+    Loads condition icons off the Tk thread. Resized images are kept on disk
+    and ready PhotoImages in a small LRU, so repeat renders never hit the network.
+    `dispatch(func, *args)` must run func on the Tk thread (e.g. widget.after(0, ...)).
+    """
+
+    def __init__(self, dispatch, cache_dir=ICON_DIR, max_images=48, size=ICON_SIZE):
+        self.dispatch = dispatch
+        self.cache_dir = cache_dir
+        self.max_images = max_images
+        self.size = size
+        self._photos = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="icons")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, url):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}_{self.size[0]}x{self.size[1]}.png")
+
+    def _load_image(self, url):
+        from PIL import Image
+        path = self._disk_path(url)
+        if os.path.exists(path):
+            try:
+                with Image.open(path) as img:
+                    img.load()
+                    return img.copy()
+            except OSError:
+                pass
+        img = Image.open(BytesIO(fetch_bytes(url))).convert("RGBA").resize(self.size)
+        try:
+            img.save(path, format="PNG")
+        except OSError as e:
+            print(f"Icon cache error: {e}")
+        return img
+
+    def get_cached(self, url):
+        """Returns a ready PhotoImage or None. Tk thread only."""
+        photo = self._photos.get(url)
+        if photo is not None:
+            self._photos.move_to_end(url)
+        return photo
+
+    def request(self, url, callback=None):
+        """Calls callback(photo) on the Tk thread once the icon is ready."""
+        url = normalize_icon_url(url)
+        photo = self.get_cached(url)
+        if photo is not None:
+            if callback:
+                callback(photo)
+            return
+        with self._lock:
+            if url in self._pending:
+                if callback:
+                    self._pending[url].append(callback)
+                return
+            self._pending[url] = [callback] if callback else []
+        self._pool.submit(self._worker, url)
+
+    def prefetch(self, urls):
+        for url in urls:
+            self.request(url)
+
+    def _worker(self, url):
+        try:
+            img = self._load_image(url)
+        except Exception as e:
+            print(f"Icon load failed: {e}")
+            img = None
+        self.dispatch(self._deliver, url, img)
+
+    def _deliver(self, url, img):
+        with self._lock:
+            callbacks = self._pending.pop(url, [])
+        if img is None:
+            return
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(img)
+        self._photos[url] = photo
+        while len(self._photos) > self.max_images:
+            self._photos.popitem(last=False)
+        for callback in callbacks:
+            callback(photo)
@@ -0,0 +1,103 @@
+from array import array
+import time
+
+
+class CurrentConditions:
+    __slots__ = ("temp_c", "temp_f", "feelslike_c", "feelslike_f", "condition", "icon",
+                 "wind_kph", "wind_mph", "humidity", "last_updated", "last_updated_epoch")
+
+    def __init__(self, current):
+        self.temp_c = current["temp_c"]
+        self.temp_f = current["temp_f"]
+        self.feelslike_c = current["feelslike_c"]
+        self.feelslike_f = current["feelslike_f"]
+        self.condition = current["condition"]["text"]
+        self.icon = current["condition"]["icon"]
+        self.wind_kph = current["wind_kph"]
+        self.wind_mph = current["wind_mph"]
+        self.humidity = current["humidity"]
+        self.last_updated = current["last_updated"]
+        self.last_updated_epoch = current.get("last_updated_epoch")
+
+    def temp(self, unit):
+        return self.temp_c if unit == "C" else self.temp_f
+
+    def feels(self, unit):
+        return self.feelslike_c if unit == "C" else self.feelslike_f
+
+
+class HourlySeries:
+    """Column-oriented hourly data for one day, one array per field."""
+    __slots__ = ("times", "temp_c", "temp_f", "feelslike_c", "feelslike_f", "precip_mm", "conditions")
+
+    def __init__(self, hours):
+        self.times = [h["time"].split(" ")[1] for h in hours]
+        self.temp_c = array("d", (h["temp_c"] for h in hours))
+        self.temp_f = array("d", (h["temp_f"] for h in hours))
+        self.feelslike_c = array("d", (h.get("feelslike_c", h["temp_c"]) for h in hours))
+        self.feelslike_f = array("d", (h.get("feelslike_f", h["temp_f"]) for h in hours))
+        self.precip_mm = array("d", (h.get("precip_mm", 0.0) for h in hours))
+        self.conditions = [h["condition"]["text"] for h in hours]
+
+    def __len__(self):
+        return len(self.times)
+
+    def temps(self, unit):
+        return self.temp_c if unit == "C" else self.temp_f
+
+    def feels(self, unit):
+        return self.feelslike_c if unit == "C" else self.feelslike_f
+
+
+class DailyRecord:
+    __slots__ = ("date", "maxtemp_c", "maxtemp_f", "mintemp_c", "mintemp_f", "condition", "icon")
+
+    def __init__(self, forecastday):
+        day = forecastday["day"]
+        self.date = forecastday["date"]
+        self.maxtemp_c = day["maxtemp_c"]
+        self.maxtemp_f = day["maxtemp_f"]
+        self.mintemp_c = day["mintemp_c"]
+        self.mintemp_f = day["mintemp_f"]
+        self.condition = day["condition"]["text"]
+        self.icon = day["condition"]["icon"]
+
+    def max_temp(self, unit):
+        return self.maxtemp_c if unit == "C" else self.maxtemp_f
+
+    def min_temp(self, unit):
+        return self.mintemp_c if unit == "C" else self.mintemp_f
+
+
+class WeatherSnapshot:
+    """
+    Parsed forecast response. Holds both unit systems so the UI can
+    re-render without going back to the network.
+    """
+    __slots__ = ("name", "country", "current", "hourly", "days", "fetched_at", "digest")
+
+    def __init__(self, name, country, current, hourly, days, fetched_at=None):
+        self.name = name
+        self.country = country
+        self.current = current
+        self.hourly = hourly
+        self.days = days
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        # Hash of the response it was parsed from, if known (see weather_core.payload_digest).
+        self.digest = None
+
+    @classmethod
+    def from_json(cls, data):
+        location = data["location"]
+        forecastdays = data["forecast"]["forecastday"]
+        return cls(
+            location["name"],
+            location["country"],
+            CurrentConditions(data["current"]),
+            HourlySeries(forecastdays[0]["hour"]),
+            [DailyRecord(fd) for fd in forecastdays[:3]],
+        )
+
+    @property
+    def title(self):
+        return f"{self.name}, {self.country}"
@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# WeatherAPI refreshes current conditions roughly every 15 minutes.
+UPDATE_PERIOD = 15 * 60
+MIN_INTERVAL = 60
+MAX_BACKOFF = 30 * 60
+RATE_LIMIT_BACKOFF = 5 * 60
+
+
+class WatchedLocation:
+    __slots__ = ("query", "next_due", "failures", "digest", "in_flight")
+
+    def __init__(self, query):
+        self.query = query
+        self.next_due = 0.0
+        self.failures = 0
+        self.digest = None
+        self.in_flight = False
+
+
+class AutoRefresher:
+    """
+    Polls watched locations in the background. Each location is re-fetched
+    shortly after WeatherAPI is expected to publish new data (based on
+    last_updated_epoch); unchanged payloads are skipped by hash, failures back
+    off exponentially, and nothing is polled while the window is minimized.
+    """
+
+    def __init__(self, root, refresh, post, on_update, on_error=None, tick_ms=1000, max_workers=2):
+        self.root = root
+        self.refresh = refresh
+        self.post = post
+        self.on_update = on_update
+        self.on_error = on_error
+        self.tick_ms = tick_ms
+        self.watched = {}
+        self.enabled = False
+        self.skipped = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+        self._after_id = None
+
+    def watch(self, query, snapshot=None):
+        """
+        Starts polling query. Pass the snapshot just loaded for it so the
+        first poll waits for newer data instead of re-fetching the same payload.
+        """
+        if query not in self.watched:
+            self.watched[query] = WatchedLocation(query)
+        if snapshot is not None:
+            item = self.watched[query]
+            item.digest = snapshot.digest
+            if not item.in_flight:
+                item.next_due = self.next_poll(snapshot.current.last_updated_epoch)
+
+    def unwatch(self, query):
+        self.watched.pop(query, None)
+
+    def start(self):
+        if not self.enabled:
+            self.enabled = True
+            self._tick()
+
+    def stop(self):
+        self.enabled = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        if not self.enabled:
+            return
+        if self.root.state() != "iconic":
+            now = time.time()
+            for item in list(self.watched.values()):
+                if not item.in_flight and item.next_due <= now:
+                    item.in_flight = True
+                    self._pool.submit(self._run, item)
+        self._after_id = self.root.after(self.tick_ms, self._tick)
+
+    def _run(self, item):
+        try:
+            snapshot, digest = self.refresh(item.query)
+        except Exception as e:
+            self.post(self._failed, item, e)
+            return
+        self.post(self._succeeded, item, snapshot, digest)
+
+    def _succeeded(self, item, snapshot, digest):
+        item.in_flight = False
+        item.failures = 0
+        item.next_due = self.next_poll(snapshot.current.last_updated_epoch)
+        if digest == item.digest:
+            self.skipped += 1
+            return
+        item.digest = digest
+        if item.query in self.watched:
+            self.on_update(item.query, snapshot)
+
+    def _failed(self, item, error):
+        item.in_flight = False
+        item.failures += 1
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        base = RATE_LIMIT_BACKOFF if status == 429 else MIN_INTERVAL
+        item.next_due = time.time() + min(MAX_BACKOFF, base * 2 ** (item.failures - 1))
+        if self.on_error:
+            self.on_error(item.query, error)
+
+    @staticmethod
+    def next_poll(last_updated_epoch, now=None):
+        now = now if now is not None else time.time()
+        if not last_updated_epoch:
+            return now + UPDATE_PERIOD
+        expected = last_updated_epoch + UPDATE_PERIOD + 30
+        return max(now + MIN_INTERVAL, expected)
@@ -0,0 +1,112 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FetchScheduler:
+    """
+    Runs fetch jobs on a small worker pool and hands results back to the Tk
+    main loop through one queue. Only the newest request wins: input is
+    debounced, identical in-flight queries are shared, and results from
+    superseded requests are dropped by generation id.
+    """
+
+    def __init__(self, root, max_workers=2, debounce_ms=250, poll_ms=50, on_stats=None):
+        self.root = root
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        self.on_stats = on_stats
+        self.generation = 0
+        self.dropped = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._results = queue.Queue()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._debounce_id = None
+        self._pending = None
+        self._last_stats = None
+        self.root.after(self.poll_ms, self._drain)
+
+    @property
+    def queue_depth(self):
+        with self._lock:
+            return len(self._in_flight) + self._results.qsize() + (1 if self._pending else 0)
+
+    def submit(self, key, func, on_result, on_error=None, debounce=True):
+        """Schedules func() and calls on_result(value) on the Tk thread if still current."""
+        self.generation += 1
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = (self.generation, key, func, on_result, on_error)
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if debounce and self.debounce_ms:
+            self._debounce_id = self.root.after(self.debounce_ms, self._dispatch)
+        else:
+            self._dispatch()
+        self._report()
+
+    def post(self, callback, *args):
+        """Queues a callback to run on the Tk thread. Safe from any thread."""
+        self._results.put((None, callback, args))
+
+    def _dispatch(self):
+        self._debounce_id = None
+        if self._pending is None:
+            return
+        generation, key, func, on_result, on_error = self._pending
+        self._pending = None
+        with self._lock:
+            for other_key, job in list(self._in_flight.items()):
+                if other_key != key and job["future"].cancel():
+                    del self._in_flight[other_key]
+                    self.dropped += 1
+            job = self._in_flight.get(key)
+            if job is not None:
+                job["generation"] = generation
+                job["on_result"] = on_result
+                job["on_error"] = on_error
+                return
+            job = {"generation": generation, "on_result": on_result, "on_error": on_error}
+            self._in_flight[key] = job
+            job["future"] = self._pool.submit(self._run, key, func)
+
+    def _run(self, key, func):
+        try:
+            value, error = func(), None
+        except Exception as e:
+            value, error = None, e
+        with self._lock:
+            job = self._in_flight.pop(key, None)
+        if job is None:
+            return
+        self._results.put((job["generation"], job, (value, error)))
+
+    def _drain(self):
+        try:
+            while True:
+                generation, target, args = self._results.get_nowait()
+                if generation is None:
+                    target(*args)
+                    continue
+                if generation != self.generation:
+                    self.dropped += 1
+                    continue
+                value, error = args
+                if error is None:
+                    target["on_result"](value)
+                elif target["on_error"]:
+                    target["on_error"](error)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            print(f"Scheduler callback error: {e}")
+        self._report()
+        self.root.after(self.poll_ms, self._drain)
+
+    def _report(self):
+        stats = (self.queue_depth, self.dropped)
+        if self.on_stats and stats != self._last_stats:
+            self._last_stats = stats
+            self.on_stats(*stats)
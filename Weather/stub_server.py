@@ -0,0 +1,76 @@
+"""
+Tiny WeatherAPI stand-in for offline runs and benchmarks.
+
+    python stub_server.py --port 8000 --delay 0.2
+    python batch.py Paris London --base-url http://127.0.0.1:8000/v1
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CONDITION = {"text": "Partly cloudy", "icon": "//cdn.weatherapi.com/weather/64x64/day/116.png"}
+
+
+def fake_forecast(q, days=3):
+    seed = sum(map(ord, q)) % 15
+    today = datetime.now().strftime("%Y-%m-%d")
+    hours = [
+        {"time": f"{today} {h:02d}:00", "temp_c": 15.0 + seed + h / 4, "temp_f": 59.0 + seed * 1.8 + h * 0.45,
+         "feelslike_c": 14.0 + seed + h / 4, "feelslike_f": 57.2 + seed * 1.8 + h * 0.45,
+         "precip_mm": 0.1 * (h % 5), "condition": CONDITION}
+        for h in range(24)
+    ]
+    forecastdays = [
+        {"date": today, "hour": hours,
+         "day": {"maxtemp_c": 21.0 + seed, "maxtemp_f": 69.8 + seed * 1.8, "mintemp_c": 15.0 + seed,
+                 "mintemp_f": 59.0 + seed * 1.8, "condition": CONDITION}}
+        for _ in range(days)
+    ]
+    return {
+        "location": {"name": q.split(",")[0].title(), "country": "Stubland"},
+        "current": {"temp_c": 18.0 + seed, "temp_f": 64.4 + seed * 1.8, "feelslike_c": 17.0 + seed,
+                    "feelslike_f": 62.6 + seed * 1.8, "condition": CONDITION, "wind_kph": 10.0,
+                    "wind_mph": 6.2, "humidity": 60, "last_updated": f"{today} 12:00",
+                    "last_updated_epoch": int(time.time()) // 900 * 900},
+        "forecast": {"forecastday": forecastdays},
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if not parts.path.endswith("forecast.json"):
+            self.send_error(404)
+            return
+        time.sleep(self.delay)
+        body = json.dumps(fake_forecast(query.get("q", ["Nowhere"])[0], int(query.get("days", ["3"])[0]))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake WeatherAPI forecasts.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+    StubHandler.delay = args.delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"Stub WeatherAPI on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+GUI-free weather fetching core. Importing this module does not touch Tk,
+PIL, matplotlib or the network, and does not require an API key until a
+request is actually made.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+from common import http_client
+from cache import ResponseCache, make_key
+from model import WeatherSnapshot
+
+load_dotenv()
+WEATHERAPI_BASE_URL = os.getenv("WEATHERAPI_BASE_URL", "https://api.weatherapi.com/v1")
+CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))
+CACHE_MAX_SIZE = int(os.getenv("WEATHER_CACHE_MAX_SIZE", "64"))
+
+http_client.get_client().set_timeout("api.weatherapi.com", (3.05, 10))
+http_client.get_client().set_timeout("ipinfo.io", (3.05, 5))
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_api_key():
+    api_key = os.getenv("WEATHERAPI_KEY")
+    if not api_key:
+        raise ValueError("API key not found")
+    return api_key
+
+
+def get_response_cache():
+    global _response_cache
+    # First called from scheduler and refresher workers, possibly at the same time.
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(ttl=CACHE_TTL, max_size=CACHE_MAX_SIZE, decode=parse_snapshot)
+        return _response_cache
+
+
+def fetch_json(url, params=None, timeout=None):
+    r = http_client.get(url, params=params, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+def fetch_bytes(url, timeout=None):
+    r = http_client.get(url, timeout=timeout)
+    r.raise_for_status()
+    return r.content
+
+
+def detect_location_by_ip():
+    data = fetch_json("https://ipinfo.io/json")
+    city = data.get("city")
+    region = data.get("region")
+    country = data.get("country")
+    if city:
+        return f"{city},{region},{country}"
+    loc = data.get("loc")
+    if loc:
+        return loc
+    raise RuntimeError("IP location failed")
+
+
+def build_weatherapi_url(endpoint="forecast.json", base_url=None):
+    return f"{(base_url or WEATHERAPI_BASE_URL).rstrip('/')}/{endpoint}"
+
+
+def forecast_params(location_query, days=3, require_key=True):
+    """require_key=False is for stub servers, which don't check the key."""
+    key = get_api_key() if require_key else os.getenv("WEATHERAPI_KEY", "")
+    return {"key": key, "q": location_query, "days": days, "aqi": "no", "alerts": "no"}
+
+
+def location_key(location_query):
+    return make_key(build_weatherapi_url(), {"q": location_query})
+
+
+def load_snapshot(location_query, on_refresh=None):
+    """
+    Returns a WeatherSnapshot for the query, going through the response cache.
+    If a stale entry was served, on_refresh(snapshot) is called from a
+    background thread once the fresh copy arrives.
+    """
+    url = build_weatherapi_url()
+    params = forecast_params(location_query)
+    return get_response_cache().get_or_fetch(
+        make_key(url, params),
+        lambda: fetch_json(url, params=params),
+        on_refresh=on_refresh,
+    )
+
+
+def payload_digest(data):
+    """Hash of the weather part of a response, ignoring the ticking local clock."""
+    body = json.dumps([data.get("current"), data.get("forecast")], sort_keys=True)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def parse_snapshot(data):
+    snapshot = WeatherSnapshot.from_json(data)
+    snapshot.digest = payload_digest(data)
+    return snapshot
+
+
+def refresh_snapshot(location_query):
+    """Fetches a fresh forecast, stores it in the cache and returns (snapshot, digest)."""
+    url = build_weatherapi_url()
+    params = forecast_params(location_query)
+    data = fetch_json(url, params=params)
+    snapshot = get_response_cache().put(make_key(url, params), data)
+    return snapshot, snapshot.digest
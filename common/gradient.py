@@ -0,0 +1,76 @@
+import tkinter as tk
+from collections import OrderedDict
+
+MAX_CACHED = 8
+_cache = OrderedDict()
+
+
+def _row_colors(master, color1, color2, height):
+    (r1, g1, b1) = master.winfo_rgb(color1)
+    (r2, g2, b2) = master.winfo_rgb(color2)
+    steps = max(1, height)
+    return [
+        "#%02x%02x%02x" % (
+            (r1 + (r2 - r1) * i // steps) >> 8,
+            (g1 + (g2 - g1) * i // steps) >> 8,
+            (b1 + (b2 - b1) * i // steps) >> 8,
+        )
+        for i in range(height)
+    ]
+
+
+def vertical_gradient(master, width, height, color1, color2):
+    """
+    Returns a PhotoImage filled with a top-to-bottom gradient. The row colors
+    are uploaded as a single one-pixel column that Tk tiles across the width,
+    and images are memoized by (size, colors) so repeat sizes cost nothing.
+    """
+    width, height = max(1, int(width)), max(1, int(height))
+    key = (id(master.tk), width, height, color1, color2)
+    image = _cache.get(key)
+    if image is not None:
+        _cache.move_to_end(key)
+        return image
+    image = tk.PhotoImage(master=master, width=width, height=height)
+    column = " ".join("{%s}" % c for c in _row_colors(master, color1, color2, height))
+    image.put(column, to=(0, 0, width, height))
+    _cache[key] = image
+    while len(_cache) > MAX_CACHED:
+        _cache.popitem(last=False)
+    return image
+
+
+class GradientBackground:
+    """
+    Keeps one canvas image item showing a gradient and redraws it after
+    resizes, coalescing bursts of <Configure> events into one render.
+    """
+
+    def __init__(self, canvas, color1, color2, delay_ms=30, tag="gradient"):
+        self.canvas = canvas
+        self.color1 = color1
+        self.color2 = color2
+        self.delay_ms = delay_ms
+        self.tag = tag
+        self.image = None
+        self._size = None
+        self._after_id = None
+        self.item = canvas.create_image(0, 0, anchor="nw", tags=(tag,))
+        canvas.lower(tag)
+        canvas.bind("<Configure>", self._schedule, add="+")
+
+    def _schedule(self, event=None):
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+        self._after_id = self.canvas.after(self.delay_ms, self.redraw)
+
+    def redraw(self, width=None, height=None):
+        self._after_id = None
+        width = width or self.canvas.winfo_width()
+        height = height or self.canvas.winfo_height()
+        if (width, height) == self._size or width < 2 or height < 2:
+            return
+        self._size = (width, height)
+        self.image = vertical_gradient(self.canvas, width, height, self.color1, self.color2)
+        self.canvas.itemconfig(self.item, image=self.image)
+        self.canvas.lower(self.tag)
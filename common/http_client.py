@@ -0,0 +1,180 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = (3.05, 10)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostMetrics:
+    __slots__ = ("requests", "retries", "failures", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+
+class HttpClient:
+    """
+    Keeps one pooled requests.Session per host so repeat calls reuse warm
+    connections. Adds per-host timeouts, jittered exponential-backoff retries
+    and simple latency / connection-reuse metrics. requests itself is only
+    imported on first use.
+    """
+
+    def __init__(self, pool_maxsize=4, retries=2, backoff=0.3, max_backoff=4.0, max_retry_after=30.0,
+                 timeouts=None):
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # A longer Retry-After is not waited out; the response is returned instead.
+        self.max_retry_after = max_retry_after
+        self.timeouts = dict(timeouts or {})
+        self._sessions = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def set_timeout(self, host, timeout):
+        self.timeouts[host] = timeout
+
+    def ensure_pool_size(self, size):
+        """Grows the per-host connection pools to at least size, e.g. to match a thread pool."""
+        with self._lock:
+            if size <= self.pool_maxsize:
+                return
+            self.pool_maxsize = size
+            for session in self._sessions.values():
+                old = set(session.adapters.values())
+                self._mount(session)
+                # Idle connections are dropped; ones in use are closed when released.
+                for adapter in old:
+                    adapter.close()
+
+    def _mount(self, session):
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                import requests
+                session = requests.Session()
+                self._mount(session)
+                self._sessions[host] = session
+                self._metrics[host] = HostMetrics()
+            return session
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        return float(value) if value and value.isdigit() else None
+
+    def _sleep_before_retry(self, attempt, response=None):
+        retry_after = self._retry_after(response) if response is not None else None
+        if retry_after is not None:
+            # Never earlier than the server asked; jitter only goes on top.
+            time.sleep(retry_after + random.uniform(0, self.backoff))
+            return
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        import requests
+        host = urlsplit(url).netloc
+        session = self.session_for(host)
+        metrics = self._metrics[host]
+        if timeout is None:
+            timeout = self.timeouts.get(host, DEFAULT_TIMEOUT)
+        if retries is None:
+            retries = self.retries
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(metrics, time.perf_counter() - start)
+                if attempt >= retries:
+                    metrics.failures += 1
+                    raise
+                metrics.retries += 1
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+            self._record(metrics, time.perf_counter() - start)
+            if (response.status_code in RETRY_STATUSES and attempt < retries
+                    and (self._retry_after(response) or 0) <= self.max_retry_after):
+                metrics.retries += 1
+                response.close()
+                self._sleep_before_retry(attempt, response)
+                attempt += 1
+                continue
+            if response.status_code >= 400:
+                metrics.failures += 1
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def _record(self, metrics, elapsed):
+        metrics.requests += 1
+        metrics.total_latency += elapsed
+        metrics.max_latency = max(metrics.max_latency, elapsed)
+
+    def _new_connections(self, session):
+        created = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    created += pool.num_connections
+        return created
+
+    def metrics(self):
+        """Returns per-host counters including how many requests reused a connection."""
+        report = {}
+        with self._lock:
+            hosts = list(self._sessions.items())
+        for host, session in hosts:
+            m = self._metrics[host]
+            connections = self._new_connections(session)
+            report[host] = {
+                "requests": m.requests,
+                "retries": m.retries,
+                "failures": m.failures,
+                "connections": connections,
+                "reused": max(0, m.requests - connections),
+                "avg_latency_ms": (m.total_latency / m.requests * 1000) if m.requests else 0.0,
+                "max_latency_ms": m.max_latency * 1000,
+            }
+        return report
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)